@@ -1,4 +1,5 @@
-from pynvml3.device import Device
+from pynvml3.device import Device, poll_devices, poll_energy_consumption, poll_getters, poll_violation_status
+from .collector import SnapshotCollector
 from .constraints import PowerLimit, LockedClocks, ApplicationClockLimit
 from .constants import *
 from .enums import *
@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Iterable, Optional
+
+from pynvml3.errors import NVMLErrorTimeout
+from pynvml3.event_set import EventSet
+from pynvml3.flags import EventType
+from pynvml3.structs import DeviceSnapshot, EventData
+
+
+class SnapshotCollector:
+    """Keeps the latest snapshot of a device up to date on a background thread.
+
+    The snapshot is refreshed ``snapshot_hz`` times per second and, if event types
+    were registered, right after one of these events occurred.
+    Readers get the last snapshot from :attr:`latest` without calling into NVML.
+    A stopped collector can be started again.
+    """
+
+    def __init__(self, device: "Device", event_types: EventType = EventType.NONE,
+                 snapshot_hz: float = 10.0, fields: Optional[Iterable[str]] = None):
+        """
+        Args:
+            device (Device): the device to poll
+            event_types: events that trigger an immediate refresh
+            snapshot_hz: how often the snapshot is refreshed without events
+            fields: names of the DeviceSnapshot fields to query, defaults to all
+        """
+        if snapshot_hz <= 0:
+            raise ValueError(f"snapshot_hz must be positive. But was {snapshot_hz}")
+        self.device = device
+        self.interval = 1 / snapshot_hz
+        # NVML waits in whole milliseconds, a timeout of 0 would make the thread spin
+        self._wait_ms = max(1, int(self.interval * 1000))
+        self.fields = frozenset(DeviceSnapshot._fields if fields is None else fields)
+        self.event_types = event_types
+        self.event_set: Optional[EventSet] = None
+        # the exception that stopped the background thread, if any
+        self.error: Optional[Exception] = None
+        # the events only wake the thread up, their data is not kept
+        self._event_data = EventData()
+        self._snapshot: Optional[DeviceSnapshot] = None
+        self._timestamp = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SnapshotCollector":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def latest(self) -> Optional[DeviceSnapshot]:
+        """The most recent snapshot, None until the first one was taken.
+        Raises the exception that stopped the background thread, if there was one."""
+        if self.error is not None:
+            raise self.error
+        return self._snapshot
+
+    @property
+    def age(self) -> float:
+        """Seconds since the most recent snapshot was taken."""
+        return time.monotonic() - self._timestamp
+
+    def start(self) -> "SnapshotCollector":
+        """Registers the events, takes a first snapshot and starts the background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError("SnapshotCollector is already running")
+        self.error = None
+        self._stopped.clear()
+        if self.event_types:
+            self.event_set = self.device.register_events(self.event_types)
+        try:
+            self._refresh()
+        except Exception:
+            self._free_event_set()
+            raise
+        self._thread = threading.Thread(target=self._run, name="SnapshotCollector", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the background thread and releases the event set.
+        Raises the exception that stopped the background thread, if there was one."""
+        self._stopped.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+        self._free_event_set()
+        if self.error is not None:
+            raise self.error
+
+    def _free_event_set(self) -> None:
+        if self.event_set is not None:
+            self.event_set.free()
+            self.event_set = None
+
+    def _refresh(self) -> None:
+        # a single assignment, readers never see a partially updated snapshot
+        self._snapshot = self.device.snapshot(self.fields)
+        self._timestamp = time.monotonic()
+
+    def _wait(self) -> None:
+        if self.event_set is None:
+            self._stopped.wait(self.interval)
+            return
+        try:
+            self.event_set.wait(self._wait_ms, self._event_data)
+        except NVMLErrorTimeout:
+            pass
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                self._wait()
+                if not self._stopped.is_set():
+                    self._refresh()
+        except Exception as e:
+            # e.g. the GPU was lost, readers must not keep getting the stale snapshot
+            self.error = e
@@ -1,5 +1,5 @@
 from pynvml3 import Device
-from pynvml3.enums import ClockType
+from pynvml3.enums import ClockType, ClockId
 
 """This module contains classes to Manage resource constraints on GPUS.
 All classes are implemented as context managers, so the constraints will be applied when entering the context and
@@ -1,8 +1,15 @@
-import math
+import functools
+import inspect
 import os
-from ctypes import c_uint, byref, c_char_p, c_int, c_ulonglong, create_string_buffer, sizeof, c_ulong, pointer
-from typing import Tuple, List
-
+import struct
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from ctypes import Array, c_uint, byref, c_char, c_char_p, c_int, c_ulonglong, sizeof, c_ulong, c_void_p, pointer, \
+    cast
+from typing import Any, Callable, Dict, Tuple, List, Iterable, Union
+
+from pynvml3.collector import SnapshotCollector
 from pynvml3.constants import VALUE_NOT_AVAILABLE_ulonglong
 from pynvml3.enums import ClockType, ClockId, EccCounterType, RestrictedAPI, EnableState, ComputeMode, DriverModel, \
     GpuOperationMode, FieldId, BrandType, InfoRom, TemperatureSensors, TemperatureThresholds, PowerState, \
@@ -11,10 +18,215 @@ from pynvml3.enums import ClockType, ClockId, EccCounterType, RestrictedAPI, Ena
 from pynvml3.errors import Return, NVMLError, NVMLErrorNotFound
 from pynvml3.event_set import EventSet
 from pynvml3.flags import EventType
+from pynvml3.functions import NvmlFunction
 from pynvml3.nvlink import NvLink
 from pynvml3.structs import CDevicePointer, FieldValue, PciInfo, Memory, BAR1Memory, EccErrorCounts, Utilization, \
     ProcessInfo, \
-    AccountingStats, BridgeChipHierarchy, RawSample, ViolationTime, Sample
+    AccountingStats, BridgeChipHierarchy, RawSample, ViolationTime, Sample, RunningProcess, DeviceSnapshot
+
+
+def _positional_arguments(method):
+    """Returns a function that turns the arguments of a call to method into positional ones,
+    so keyword and positional calls of a cached getter share one cache entry."""
+
+    signature = inspect.signature(method)
+
+    def bind(self, args: tuple, kwargs: dict) -> tuple:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        return bound.args[1:]
+
+    return bind
+
+
+def immutable(method):
+    """Decorator for getters whose value never changes during the lifetime
+    of a device handle. NVML is queried only once per argument combination,
+    later calls are answered from the device's cache.
+    """
+
+    name = (method.__name__,)
+    bind = _positional_arguments(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if kwargs:
+            args = bind(self, args, kwargs)
+        key = name + args
+        try:
+            value = self._immutable_cache[key]
+        except KeyError:
+            value = self._immutable_cache[key] = method(self, *args)
+        if isinstance(value, list):
+            # don't let callers modify the cached list
+            return list(value)
+        return value
+
+    return wrapper
+
+
+def cached_for(seconds: Union[float, str]):
+    """Decorator for getters that are commonly called several times in a row,
+    e.g. by the ``get_current_*``/``get_pending_*`` pairs.
+    Results are cached on the device for the given number of seconds,
+    or for the number of seconds stored in the device attribute of the given name.
+    Setters that change the value must call :func:`Device._invalidate`.
+    """
+
+    # resolved once per decorated getter instead of on every call
+    ttl_attribute = seconds if isinstance(seconds, str) else None
+    monotonic = time.monotonic
+
+    def decorator(method):
+        name = (method.__name__,)
+        bind = _positional_arguments(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            ttl = seconds if ttl_attribute is None else getattr(self, ttl_attribute)
+            if ttl <= 0:
+                # caching disabled, skip the bookkeeping
+                return method(self, *args, **kwargs)
+            if kwargs:
+                args = bind(self, args, kwargs)
+            key = name + args
+            now = monotonic()
+            entry = self._timed_cache.get(key)
+            if entry is not None and now < entry[1]:
+                return entry[0]
+            value = method(self, *args)
+            self._timed_cache[key] = (value, now + ttl)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+# Return codes compared against on every call that fills an array
+_SUCCESS = Return.SUCCESS.value
+_ERROR_INSUFFICIENT_SIZE = Return.ERROR_INSUFFICIENT_SIZE.value
+_ERROR_NOT_FOUND = Return.ERROR_NOT_FOUND.value
+
+# Native alignment, matches the padding of the ProcessInfo structure
+_PROCESS_INFO = struct.Struct("@IQ")
+
+# Each c_ulong of the cpu set holds one bit per cpu
+_ULONG_BITS = sizeof(c_ulong) * 8
+_CPU_SET_SIZE = ((os.cpu_count() or 1) + _ULONG_BITS - 1) // _ULONG_BITS
+_CpuSet = c_ulong * _CPU_SET_SIZE
+
+# Constants of the snapshot, resolved once instead of on every poll
+_SNAPSHOT_FIELDS = frozenset(DeviceSnapshot._fields)
+_TEMPERATURE_GPU = TemperatureSensors.TEMPERATURE_GPU.value
+_SNAPSHOT_CLOCKS = (("graphics_clock", ClockType.GRAPHICS.value),
+                    ("sm_clock", ClockType.SM.value),
+                    ("memory_clock", ClockType.MEM.value))
+
+
+def _to_int_list(c_array: Array, count: int) -> List[int]:
+    """Copies the first count items of an array of c_uint, c_ulonglong, ...
+    into a list of ints, converting them in a single C loop."""
+    return memoryview(c_array).cast("B").cast(c_array._type_._type_)[:count].tolist()
+
+
+class _ArrayPool(threading.local):
+    """Arrays filled by :func:`get_array`, one per item type and thread.
+    Only used when the entries are copied out before returning,
+    so callers never hold on to a reused array."""
+
+    def __init__(self):
+        self.arrays = {}
+
+    def get(self, item_type, size: int) -> Array:
+        c_array = self.arrays.get(item_type)
+        if c_array is None or len(c_array) < size:
+            c_array = self.arrays[item_type] = (item_type * size)()
+        return c_array
+
+
+_array_pool = _ArrayPool()
+
+
+def get_array(fn, item_type, size_hints: dict, handle=None, *args, max_count: int = 0,
+              unpack: struct.Struct = None) -> list:
+    """Shared implementation for NVML functions that fill an array of variable length.
+    The array is sized from the count seen by the previous call,
+    so the sizing call is only needed the first time or when the array grew.
+
+    Args:
+        fn: the NVML function to call
+        item_type: the ctypes type of the array items
+        size_hints: counts of previous calls, updated by this function
+        handle: the device or unit handle, None for functions without a handle
+        *args: arguments passed between the handle and the count
+        max_count: documented upper bound of the count, if there is one.
+            The first call then uses an array of this size instead of a sizing call.
+        unpack: struct format matching item_type. If given, the entries are
+            unpacked into tuples in one pass instead of being copied as ctypes structures.
+
+    Returns: the filled entries of the array
+
+    """
+    key = (fn.__name__,) + args
+    if handle is not None:
+        args = (handle,) + args
+    hint = size_hints.get(key)
+    if hint is None:
+        c_count = c_uint(max_count)
+    else:
+        # oversize the array for the rare cases where additional entries
+        # are created between NVML calls
+        c_count = c_uint(hint * 2 + 5 if hint else 0)
+    # simple types and unpacked structures are copied out of the array
+    simple_type = isinstance(getattr(item_type, "_type_", None), str)
+    pooled = simple_type or unpack is not None
+    while True:
+        if not c_count.value:
+            c_array = None
+        elif pooled:
+            c_array = _array_pool.get(item_type, c_count.value)
+            c_count.value = len(c_array)
+        else:
+            c_array = (item_type * c_count.value)()
+        ret = fn(*args, byref(c_count), c_array)
+        if ret == _SUCCESS:
+            # some functions report the size through a successful sizing call
+            if c_array is not None or c_count.value == 0:
+                break
+        elif ret != _ERROR_INSUFFICIENT_SIZE:
+            raise NVMLError.from_return(ret)
+        c_count.value = c_count.value * 2 + 5
+
+    count = c_count.value
+    size_hints[key] = count
+    if count == 0:
+        return []
+    if simple_type:
+        # array of a simple type like c_ulonglong
+        return _to_int_list(c_array, count)
+    if unpack is not None:
+        return list(unpack.iter_unpack(memoryview(c_array).cast("B")[:count * unpack.size]))
+    return c_array[:count]
+
+
+class _Scratch(threading.local):
+    """Output buffers of the getters.
+    Reused across calls instead of allocating new ctypes objects,
+    every thread gets its own set."""
+
+    def __init__(self):
+        self.uint = c_uint()
+        self.uint_ref = byref(self.uint)
+        self.ulonglong = c_ulonglong()
+        self.ulonglong_ref = byref(self.ulonglong)
+        self.uint2 = c_uint()
+        self.uint2_ref = byref(self.uint2)
+        self.ulonglong2 = c_ulonglong()
+        self.ulonglong2_ref = byref(self.ulonglong2)
+        self.utilization = Utilization()
+        self.memory = Memory()
+        self.samples = {}
 
 
 class Device:
@@ -31,11 +243,148 @@ class Device:
     SERIAL_BUFFER_SIZE = 30
     VBIOS_VERSION_BUFFER_SIZE = 32
     PCI_BUS_ID_BUFFER_SIZE = 16
+    # upper bounds for the first call of the array getters, well above what drivers report
+    MAX_SUPPORTED_CLOCKS = 128
+    MAX_RETIRED_PAGES = 128
+    MAX_RUNNING_PROCESSES = 512
+    MAX_NEAREST_GPUS = 64
+    # how often the sample buffer is sized again before giving up on a device
+    # that records samples faster than they can be fetched
+    MAX_SAMPLE_ATTEMPTS = 3
+
+    PAIRED_GETTER_TTL = 0.01
+    """Seconds for which the current/pending pairs are shared between calls, 0 to always query NVML."""
+
+    # NVML refreshes these readings periodically, querying them more often
+    # returns the same value. Disabled by default, every call queries NVML.
+    # Set them on a device, e.g. ``device.POWER_USAGE_TTL = 0.05``,
+    # to let calls in quick succession share one reading.
+    POWER_USAGE_TTL = 0
+    """Seconds for which a power reading is reused, 0 to always query NVML."""
+    TEMPERATURE_TTL = 0
+    """Seconds for which a temperature reading is reused, 0 to always query NVML."""
+    CLOCK_TTL = 0
+    """Seconds for which a clock reading is reused, 0 to always query NVML."""
+    UTILIZATION_TTL = 0
+    """Seconds for which utilization readings are reused, 0 to always query NVML.
+    NVML updates them every 1/6 to 1 second, depending on the product."""
+
+    # NVML functions, resolved once per device on first use
+    _fn_get_clock = NvmlFunction("nvmlDeviceGetClock")
+    _fn_get_cuda_compute_capability = NvmlFunction("nvmlDeviceGetCudaComputeCapability")
+    _fn_get_max_customer_boost_clock = NvmlFunction("nvmlDeviceGetMaxCustomerBoostClock")
+    _fn_get_total_energy_consumption = NvmlFunction("nvmlDeviceGetTotalEnergyConsumption")
+    _fn_clear_ecc_error_counts = NvmlFunction("nvmlDeviceClearEccErrorCounts")
+    _fn_reset_gpu_locked_clocks = NvmlFunction("nvmlDeviceResetGpuLockedClocks")
+    _fn_set_api_restriction = NvmlFunction("nvmlDeviceSetAPIRestriction")
+    _fn_set_applications_clocks = NvmlFunction("nvmlDeviceSetApplicationsClocks")
+    _fn_set_compute_mode = NvmlFunction("nvmlDeviceSetComputeMode")
+    _fn_set_driver_model = NvmlFunction("nvmlDeviceSetDriverModel")
+    _fn_set_ecc_mode = NvmlFunction("nvmlDeviceSetEccMode")
+    _fn_set_gpu_locked_clocks = NvmlFunction("nvmlDeviceSetGpuLockedClocks")
+    _fn_set_gpu_operation_mode = NvmlFunction("nvmlDeviceSetGpuOperationMode")
+    _fn_set_persistence_mode = NvmlFunction("nvmlDeviceSetPersistenceMode")
+    _fn_set_power_management_limit = NvmlFunction("nvmlDeviceSetPowerManagementLimit")
+    _fn_get_field_values = NvmlFunction("nvmlDeviceGetFieldValues")
+    _fn_get_name = NvmlFunction("nvmlDeviceGetName")
+    _fn_get_board_id = NvmlFunction("nvmlDeviceGetBoardId")
+    _fn_get_multi_gpu_board = NvmlFunction("nvmlDeviceGetMultiGpuBoard")
+    _fn_get_brand = NvmlFunction("nvmlDeviceGetBrand")
+    _fn_get_serial = NvmlFunction("nvmlDeviceGetSerial")
+    _fn_get_cpu_affinity = NvmlFunction("nvmlDeviceGetCpuAffinity")
+    _fn_set_cpu_affinity = NvmlFunction("nvmlDeviceSetCpuAffinity")
+    _fn_clear_cpu_affinity = NvmlFunction("nvmlDeviceClearCpuAffinity")
+    _fn_get_minor_number = NvmlFunction("nvmlDeviceGetMinorNumber")
+    _fn_get_uuid = NvmlFunction("nvmlDeviceGetUUID")
+    _fn_get_inforom_version = NvmlFunction("nvmlDeviceGetInforomVersion")
+    _fn_get_inforom_image_version = NvmlFunction("nvmlDeviceGetInforomImageVersion")
+    _fn_get_inforom_configuration_checksum = NvmlFunction("nvmlDeviceGetInforomConfigurationChecksum")
+    _fn_validate_inforom = NvmlFunction("nvmlDeviceValidateInforom")
+    _fn_get_display_mode = NvmlFunction("nvmlDeviceGetDisplayMode")
+    _fn_get_display_active = NvmlFunction("nvmlDeviceGetDisplayActive")
+    _fn_get_persistence_mode = NvmlFunction("nvmlDeviceGetPersistenceMode")
+    _fn_get_pci_info = NvmlFunction("nvmlDeviceGetPciInfo_v2")
+    _fn_get_clock_info = NvmlFunction("nvmlDeviceGetClockInfo")
+    _fn_get_max_clock_info = NvmlFunction("nvmlDeviceGetMaxClockInfo")
+    _fn_get_applications_clock = NvmlFunction("nvmlDeviceGetApplicationsClock")
+    _fn_get_default_applications_clock = NvmlFunction("nvmlDeviceGetDefaultApplicationsClock")
+    _fn_get_supported_memory_clocks = NvmlFunction("nvmlDeviceGetSupportedMemoryClocks")
+    _fn_get_supported_graphics_clocks = NvmlFunction("nvmlDeviceGetSupportedGraphicsClocks")
+    _fn_get_fan_speed = NvmlFunction("nvmlDeviceGetFanSpeed_v2")
+    _fn_get_temperature = NvmlFunction("nvmlDeviceGetTemperature")
+    _fn_get_temperature_threshold = NvmlFunction("nvmlDeviceGetTemperatureThreshold")
+    _fn_get_power_state = NvmlFunction("nvmlDeviceGetPowerState")
+    _fn_get_performance_state = NvmlFunction("nvmlDeviceGetPerformanceState")
+    _fn_get_power_management_mode = NvmlFunction("nvmlDeviceGetPowerManagementMode")
+    _fn_get_power_management_limit = NvmlFunction("nvmlDeviceGetPowerManagementLimit")
+    _fn_get_power_management_limit_constraints = NvmlFunction("nvmlDeviceGetPowerManagementLimitConstraints")
+    _fn_get_power_management_default_limit = NvmlFunction("nvmlDeviceGetPowerManagementDefaultLimit")
+    _fn_get_enforced_power_limit = NvmlFunction("nvmlDeviceGetEnforcedPowerLimit")
+    _fn_get_power_usage = NvmlFunction("nvmlDeviceGetPowerUsage")
+    _fn_get_gpu_operation_mode = NvmlFunction("nvmlDeviceGetGpuOperationMode")
+    _fn_get_memory_info = NvmlFunction("nvmlDeviceGetMemoryInfo")
+    _fn_get_bar1_memory_info = NvmlFunction("nvmlDeviceGetBAR1MemoryInfo")
+    _fn_get_compute_mode = NvmlFunction("nvmlDeviceGetComputeMode")
+    _fn_get_ecc_mode = NvmlFunction("nvmlDeviceGetEccMode")
+    _fn_get_total_ecc_errors = NvmlFunction("nvmlDeviceGetTotalEccErrors")
+    _fn_get_detailed_ecc_errors = NvmlFunction("nvmlDeviceGetDetailedEccErrors")
+    _fn_get_memory_error_counter = NvmlFunction("nvmlDeviceGetMemoryErrorCounter")
+    _fn_get_utilization_rates = NvmlFunction("nvmlDeviceGetUtilizationRates")
+    _fn_get_encoder_utilization = NvmlFunction("nvmlDeviceGetEncoderUtilization")
+    _fn_get_decoder_utilization = NvmlFunction("nvmlDeviceGetDecoderUtilization")
+    _fn_get_pcie_replay_counter = NvmlFunction("nvmlDeviceGetPcieReplayCounter")
+    _fn_get_driver_model = NvmlFunction("nvmlDeviceGetDriverModel")
+    _fn_get_vbios_version = NvmlFunction("nvmlDeviceGetVbiosVersion")
+    _fn_get_compute_running_processes = NvmlFunction("nvmlDeviceGetComputeRunningProcesses")
+    _fn_get_graphics_running_processes = NvmlFunction("nvmlDeviceGetGraphicsRunningProcesses")
+    _fn_get_auto_boosted_clocks_enabled = NvmlFunction("nvmlDeviceGetAutoBoostedClocksEnabled")
+    _fn_set_auto_boosted_clocks_enabled = NvmlFunction("nvmlDeviceSetAutoBoostedClocksEnabled")
+    _fn_set_default_auto_boosted_clocks_enabled = NvmlFunction("nvmlDeviceSetDefaultAutoBoostedClocksEnabled")
+    _fn_reset_applications_clocks = NvmlFunction("nvmlDeviceResetApplicationsClocks")
+    _fn_register_events = NvmlFunction("nvmlDeviceRegisterEvents")
+    _fn_get_supported_event_types = NvmlFunction("nvmlDeviceGetSupportedEventTypes")
+    _fn_on_same_board = NvmlFunction("nvmlDeviceOnSameBoard")
+    _fn_get_curr_pcie_link_generation = NvmlFunction("nvmlDeviceGetCurrPcieLinkGeneration")
+    _fn_get_max_pcie_link_generation = NvmlFunction("nvmlDeviceGetMaxPcieLinkGeneration")
+    _fn_get_curr_pcie_link_width = NvmlFunction("nvmlDeviceGetCurrPcieLinkWidth")
+    _fn_get_max_pcie_link_width = NvmlFunction("nvmlDeviceGetMaxPcieLinkWidth")
+    _fn_get_supported_clocks_throttle_reasons = NvmlFunction("nvmlDeviceGetSupportedClocksThrottleReasons")
+    _fn_get_current_clocks_throttle_reasons = NvmlFunction("nvmlDeviceGetCurrentClocksThrottleReasons")
+    _fn_get_index = NvmlFunction("nvmlDeviceGetIndex")
+    _fn_get_accounting_mode = NvmlFunction("nvmlDeviceGetAccountingMode")
+    _fn_set_accounting_mode = NvmlFunction("nvmlDeviceSetAccountingMode")
+    _fn_clear_accounting_pids = NvmlFunction("nvmlDeviceClearAccountingPids")
+    _fn_get_accounting_stats = NvmlFunction("nvmlDeviceGetAccountingStats")
+    _fn_get_accounting_buffer_size = NvmlFunction("nvmlDeviceGetAccountingBufferSize")
+    _fn_get_accounting_pids = NvmlFunction("nvmlDeviceGetAccountingPids")
+    _fn_get_retired_pages = NvmlFunction("nvmlDeviceGetRetiredPages")
+    _fn_get_retired_pages_pending_status = NvmlFunction("nvmlDeviceGetRetiredPagesPendingStatus")
+    _fn_get_api_restriction = NvmlFunction("nvmlDeviceGetAPIRestriction")
+    _fn_get_bridge_chip_info = NvmlFunction("nvmlDeviceGetBridgeChipInfo")
+    _fn__get_raw_samples = NvmlFunction("nvmlDeviceGetSamples")
+    _fn_get_violation_status = NvmlFunction("nvmlDeviceGetViolationStatus")
+    _fn_get_pcie_throughput = NvmlFunction("nvmlDeviceGetPcieThroughput")
+    _fn_get_topology_nearest_gpus = NvmlFunction("nvmlDeviceGetTopologyNearestGpus")
+    _fn_get_topology_common_ancestor = NvmlFunction("nvmlDeviceGetTopologyCommonAncestor")
 
     def __init__(self, lib, handle: pointer):
         # super().__init__()
         self.lib = lib
+        if not isinstance(handle, CDevicePointer):
+            # e.g. a raw address or c_void_p obtained from another binding;
+            # converted once, so ctypes can pass it as is on every call
+            handle = cast(handle, CDevicePointer)
         self.handle = handle
+        self._immutable_cache = {}
+        self._timed_cache = {}
+        self._scratch = _Scratch()
+        self._array_size_hints = {}
+        self._nvlinks = {}
+
+    def _invalidate(self, getter: str) -> None:
+        """Drop all cached results of the given getter."""
+        for key in [key for key in self._timed_cache if key[0] == getter]:
+            del self._timed_cache[key]
 
     #
     # New Methods
@@ -44,6 +393,7 @@ class Device:
     #        Device Queries         #
     #################################
 
+    @cached_for("CLOCK_TTL")
     def get_clock(self, clock_type: ClockType, clock_id: ClockId) -> int:
         """
         Retrieves the clock speed for the clock specified by the clock type and clock ID.
@@ -56,12 +406,14 @@ class Device:
         @return: clock in MHz
         @rtype: int
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceGetClock")
-        clock_mhz = c_uint()
-        ret = fn(self.handle, clock_type.as_c_type(), clock_id.as_c_type(), byref(clock_mhz))
-        Return.check(ret)
-        return clock_mhz.value
+        fn = self._fn_get_clock
+        scratch = self._scratch
+        ret = fn(self.handle, clock_type.value, clock_id.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
+    @immutable
     def get_cuda_compute_capability(self) -> Tuple[int, int]:
         """
 
@@ -69,18 +421,20 @@ class Device:
         @rtype:
         """
         major, minor = c_int(), c_int()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetCudaComputeCapability")
+        fn = self._fn_get_cuda_compute_capability
         ret = fn(self.handle, byref(major), byref(minor))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return major.value, minor.value
 
     def get_max_customer_boost_clock(self, clock_type: ClockType) -> int:
         """Retrieves the customer defined maximum boost clock speed specified by the given clock type."""
-        fn = self.lib.get_function_pointer("nvmlDeviceGetMaxCustomerBoostClock")
-        clock_mhz = c_uint()
-        ret = fn(self.handle, clock_type.as_c_type(), byref(clock_mhz))
-        Return.check(ret)
-        return clock_mhz.value
+        fn = self._fn_get_max_customer_boost_clock
+        scratch = self._scratch
+        ret = fn(self.handle, clock_type.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     def get_total_energy_consumption(self) -> int:
         """
@@ -90,11 +444,12 @@ class Device:
         @return: energy consumption for this GPU in millijoules (mJ)
         @rtype: int
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceGetTotalEnergyConsumption")
-        energy = c_ulonglong()
-        ret = fn(self.handle, byref(energy))
-        Return.check(ret)
-        return energy.value
+        fn = self._fn_get_total_energy_consumption
+        scratch = self._scratch
+        ret = fn(self.handle, scratch.ulonglong_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.ulonglong.value
 
     #################################
     #          Drain State          #
@@ -129,9 +484,10 @@ class Device:
         @return:
         @rtype:
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceClearEccErrorCounts")
-        ret = fn(self.handle, counterType.as_c_type())
-        Return.check(ret)
+        fn = self._fn_clear_ecc_error_counts
+        ret = fn(self.handle, counterType.value)
+        if ret:
+            Return.check(ret)
 
     def reset_gpu_locked_clocks(self) -> None:
         """
@@ -141,36 +497,47 @@ class Device:
         nvmlDeviceSetApplicationsClocks.
         VOLTA_OR_NEWER
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceResetGpuLockedClocks")
+        fn = self._fn_reset_gpu_locked_clocks
         ret = fn(self.handle)
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_clock")
+        self._invalidate("get_clock_info")
 
     def set_api_restriction(self, api_type: RestrictedAPI, is_restricted: EnableState) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetAPIRestriction")
-        ret = fn(self.handle, api_type.as_c_type(),
-                 is_restricted.as_c_type())
-        Return.check(ret)
+        fn = self._fn_set_api_restriction
+        ret = fn(self.handle, api_type.value, is_restricted.value)
+        if ret:
+            Return.check(ret)
 
     # Added in 4.304
     def set_applications_clocks(self, max_mem_clock_mhz: int, max_graphics_clock_mhz: int) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetApplicationsClocks")
-        ret = fn(self.handle, c_uint(max_mem_clock_mhz), c_uint(max_graphics_clock_mhz))
-        Return.check(ret)
+        fn = self._fn_set_applications_clocks
+        ret = fn(self.handle, max_mem_clock_mhz, max_graphics_clock_mhz)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_clock")
+        self._invalidate("get_clock_info")
 
     def set_compute_mode(self, mode: ComputeMode) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetComputeMode")
-        ret = fn(self.handle, mode.as_c_type())
-        Return.check(ret)
+        fn = self._fn_set_compute_mode
+        ret = fn(self.handle, mode.value)
+        if ret:
+            Return.check(ret)
 
     def set_driver_model(self, model: DriverModel) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetDriverModel")
+        fn = self._fn_set_driver_model
         ret = fn(self.handle, model.as_c_type())
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_driver_model")
 
     def set_ecc_mode(self, mode: EnableState) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetEccMode")
-        ret = fn(self.handle, mode.as_c_type())
-        Return.check(ret)
+        fn = self._fn_set_ecc_mode
+        ret = fn(self.handle, mode.value)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_ecc_mode")
 
     def set_gpu_locked_clocks(self, min_gpu_clock_mhz: int, max_gpu_clock_mhz: int) -> None:
         """
@@ -189,26 +556,33 @@ class Device:
         @param max_gpu_clock_mhz: maximum gpu clock in MHz
         @type max_gpu_clock_mhz: int
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceSetGpuLockedClocks")
-        ret = fn(self.handle, c_uint(min_gpu_clock_mhz), c_uint(max_gpu_clock_mhz))
-        Return.check(ret)
+        fn = self._fn_set_gpu_locked_clocks
+        ret = fn(self.handle, min_gpu_clock_mhz, max_gpu_clock_mhz)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_clock")
+        self._invalidate("get_clock_info")
 
     # Added in 4.304
     def set_gpu_operation_mode(self, mode: GpuOperationMode) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetGpuOperationMode")
-        ret = fn(self.handle, mode.as_c_type())
-        Return.check(ret)
+        fn = self._fn_set_gpu_operation_mode
+        ret = fn(self.handle, mode.value)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_gpu_operation_mode")
 
     def set_persistence_mode(self, enable_state: EnableState) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetPersistenceMode")
-        ret = fn(self.handle, enable_state.as_c_type())
-        Return.check(ret)
+        fn = self._fn_set_persistence_mode
+        ret = fn(self.handle, enable_state.value)
+        if ret:
+            Return.check(ret)
 
     # Added in 4.304
     def set_power_management_limit(self, limit: int) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetPowerManagementLimit")
-        ret = fn(self.handle, c_uint(limit))
-        Return.check(ret)
+        fn = self._fn_set_power_management_limit
+        ret = fn(self.handle, limit)
+        if ret:
+            Return.check(ret)
 
     #################################
     #        NvLink Methods         #
@@ -216,13 +590,17 @@ class Device:
 
     def get_nvlink(self, link_id: int) -> "NvLink":
         """
-        Create an NvLink object, which provides nvlink methods.
+        Get the NvLink object, which provides nvlink methods.
+        The object is created once per link and reused by later calls.
         @param link_id: the id of the nvlink
         @type link_id: int
         @return: NvLink object
         @rtype: NvLink
         """
-        return NvLink(self, link_id)
+        try:
+            return self._nvlinks[link_id]
+        except KeyError:
+            return self._nvlinks.setdefault(link_id, NvLink(self, link_id))
 
     #################################
     #      Field Value Queries      #
@@ -235,146 +613,191 @@ class Device:
         the results for those field IDs will be populated from a single call
         rather than making a driver call for each fieldId. """
 
-        fn = self.lib.get_function_pointer("nvmlDeviceGetFieldValues")
+        fn = self._fn_get_field_values
         field_value: FieldValue = FieldValue()
         field_value.unused = 0
         field_value.fieldId = field_id.as_c_type()
         ret = fn(self.handle, c_int(values_count), byref(field_value))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return field_value
 
+    def get_multiple_field_values(self, field_ids: Iterable[FieldId]) -> List[FieldValue]:
+        """Request values for several fields of the device with a single NVML call.
+        The return code of each value is stored in its nvmlReturn field
+        and must be checked before looking at the value.
+        @param field_ids: the fields to query
+        @type field_ids: Iterable[FieldId]
+        @return: one FieldValue per requested field, in the same order
+        @rtype: List[FieldValue]
+        """
+        field_ids = [field_id.value for field_id in field_ids]
+        count = len(field_ids)
+        c_values = (FieldValue * count)()
+        for field_value, field_id in zip(c_values, field_ids):
+            field_value.fieldId = field_id
+        fn = self._fn_get_field_values
+        ret = fn(self.handle, count, c_values)
+        if ret:
+            Return.check(ret)
+        return c_values[:]
+
     #################################
     #          Old Methods          #
     #################################
 
+    @immutable
     def get_name(self) -> str:
-        c_name = create_string_buffer(Device.NAME_BUFFER_SIZE)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetName")
-        ret = fn(self.handle, c_name, c_uint(Device.NAME_BUFFER_SIZE))
-        Return.check(ret)
-        return c_name.value.decode("UTF-8")
+        c_name = (c_char * Device.NAME_BUFFER_SIZE)()
+        fn = self._fn_get_name
+        ret = fn(self.handle, c_name, Device.NAME_BUFFER_SIZE)
+        if ret:
+            Return.check(ret)
+        return c_name.value.decode()
 
+    @immutable
     def get_board_id(self) -> int:
-        c_id = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetBoardId")
-        ret = fn(self.handle, byref(c_id))
-        Return.check(ret)
-        return c_id.value
+        scratch = self._scratch
+        fn = self._fn_get_board_id
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
+    @immutable
     def get_multi_gpu_board(self) -> bool:
-        c_multiGpu = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetMultiGpuBoard")
-        ret = fn(self.handle, byref(c_multiGpu))
-        Return.check(ret)
-        return bool(c_multiGpu.value)
+        scratch = self._scratch
+        fn = self._fn_get_multi_gpu_board
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return bool(scratch.uint.value)
 
+    @immutable
     def get_brand(self) -> BrandType:
-        c_type = BrandType.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetBrand")
-        ret = fn(self.handle, byref(c_type))
-        Return.check(ret)
-        return BrandType(c_type.value)
+        scratch = self._scratch
+        fn = self._fn_get_brand
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return BrandType(scratch.uint.value)
 
+    @immutable
     def get_serial(self) -> str:
-        c_serial = create_string_buffer(Device.SERIAL_BUFFER_SIZE)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetSerial")
-        ret = fn(self.handle, c_serial, c_uint(Device.SERIAL_BUFFER_SIZE))
-        Return.check(ret)
-        return c_serial.value.decode("UTF-8")
+        c_serial = (c_char * Device.SERIAL_BUFFER_SIZE)()
+        fn = self._fn_get_serial
+        ret = fn(self.handle, c_serial, Device.SERIAL_BUFFER_SIZE)
+        if ret:
+            Return.check(ret)
+        return c_serial.value.decode()
 
     def get_cpu_affinity(self) -> List[int]:
-        cpu_set_size = math.ceil(os.cpu_count() / sizeof(c_ulong))
-        affinity_array = c_ulong * cpu_set_size
-        c_affinity = affinity_array()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetCpuAffinity")
-        ret = fn(self.handle, c_uint(cpu_set_size), byref(c_affinity))
-        Return.check(ret)
-        return list(c_affinity)
+        c_affinity = _CpuSet()
+        fn = self._fn_get_cpu_affinity
+        ret = fn(self.handle, _CPU_SET_SIZE, c_affinity)
+        if ret:
+            Return.check(ret)
+        return _to_int_list(c_affinity, _CPU_SET_SIZE)
 
     def set_cpu_affinity(self) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetCpuAffinity")
+        fn = self._fn_set_cpu_affinity
         ret = fn(self.handle)
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return None
 
     def clear_cpu_affinity(self) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceClearCpuAffinity")
+        fn = self._fn_clear_cpu_affinity
         ret = fn(self.handle)
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return None
 
+    @immutable
     def get_minor_number(self) -> int:
-        c_minor_number = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetMinorNumber")
-        ret = fn(self.handle, byref(c_minor_number))
-        Return.check(ret)
-        return c_minor_number.value
+        scratch = self._scratch
+        fn = self._fn_get_minor_number
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
+    @immutable
     def get_uuid(self) -> str:
-        c_uuid = create_string_buffer(Device.UUID_BUFFER_SIZE)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetUUID")
-        ret = fn(self.handle, c_uuid, c_uint(Device.UUID_BUFFER_SIZE))
-        Return.check(ret)
-        return c_uuid.value.decode("UTF-8")
+        c_uuid = (c_char * Device.UUID_BUFFER_SIZE)()
+        fn = self._fn_get_uuid
+        ret = fn(self.handle, c_uuid, Device.UUID_BUFFER_SIZE)
+        if ret:
+            Return.check(ret)
+        return c_uuid.value.decode()
 
     def get_inforom_version(self, info_rom_object: InfoRom) -> str:
-        c_version = create_string_buffer(Device.INFOROM_VERSION_BUFFER_SIZE)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetInforomVersion")
-        ret = fn(self.handle, InfoRom.c_type(info_rom_object.value),
-                 c_version, c_uint(Device.INFOROM_VERSION_BUFFER_SIZE))
-        Return.check(ret)
-        return c_version.value.decode("UTF-8")
+        c_version = (c_char * Device.INFOROM_VERSION_BUFFER_SIZE)()
+        fn = self._fn_get_inforom_version
+        ret = fn(self.handle, info_rom_object.value,
+                 c_version, Device.INFOROM_VERSION_BUFFER_SIZE)
+        if ret:
+            Return.check(ret)
+        return c_version.value.decode()
 
     # Added in 4.304
     def get_inforom_image_version(self) -> str:
-        c_version = create_string_buffer(Device.INFOROM_VERSION_BUFFER_SIZE)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetInforomImageVersion")
-        ret = fn(self.handle, c_version, c_uint(Device.INFOROM_VERSION_BUFFER_SIZE))
-        Return.check(ret)
-        return c_version.value.decode("UTF-8")
+        c_version = (c_char * Device.INFOROM_VERSION_BUFFER_SIZE)()
+        fn = self._fn_get_inforom_image_version
+        ret = fn(self.handle, c_version, Device.INFOROM_VERSION_BUFFER_SIZE)
+        if ret:
+            Return.check(ret)
+        return c_version.value.decode()
 
     # Added in 4.304
     def get_inforom_configuration_checksum(self) -> int:
-        c_checksum = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetInforomConfigurationChecksum")
-        ret = fn(self.handle, byref(c_checksum))
-        Return.check(ret)
-        return c_checksum.value
+        scratch = self._scratch
+        fn = self._fn_get_inforom_configuration_checksum
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 4.304
     def validate_inforom(self) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceValidateInforom")
+        fn = self._fn_validate_inforom
         ret = fn(self.handle)
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
 
     def get_display_mode(self) -> EnableState:
-        c_mode = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetDisplayMode")
-        ret = fn(self.handle, byref(c_mode))
-        Return.check(ret)
-        return EnableState(c_mode.value)
+        scratch = self._scratch
+        fn = self._fn_get_display_mode
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value)
 
     def get_display_active(self) -> EnableState:
-        c_mode = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetDisplayActive")
-        ret = fn(self.handle, byref(c_mode))
-        Return.check(ret)
-        return EnableState(c_mode.value)
+        scratch = self._scratch
+        fn = self._fn_get_display_active
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value)
 
     def get_persistence_mode(self) -> EnableState:
-        c_state = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPersistenceMode")
-        ret = fn(self.handle, byref(c_state))
-        Return.check(ret)
-        return EnableState(c_state.value)
+        scratch = self._scratch
+        fn = self._fn_get_persistence_mode
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value)
 
     def get_pci_info(self) -> PciInfo:
         c_info = PciInfo()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPciInfo_v2")
+        fn = self._fn_get_pci_info
         ret = fn(self.handle, byref(c_info))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_info
 
+    @cached_for("CLOCK_TTL")
     def get_clock_info(self, clock_type: ClockType) -> int:
         """
         Retrieves the current clock speeds for the device.
@@ -384,13 +807,15 @@ class Device:
         @return: the clock speed in MHz
         @rtype: int
         """
-        c_clock = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetClockInfo")
-        ret = fn(self.handle, clock_type.as_c_type(), byref(c_clock))
-        Return.check(ret)
-        return c_clock.value
+        scratch = self._scratch
+        fn = self._fn_get_clock_info
+        ret = fn(self.handle, clock_type.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 2.285
+    @immutable
     def get_max_clock_info(self, clock_type: ClockType) -> int:
         """
         Retrieves the maximum clock speeds for the device.
@@ -400,11 +825,12 @@ class Device:
         @return: the clock speed in MHz
         @rtype: int
         """
-        c_clock = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetMaxClockInfo")
-        ret = fn(self.handle, clock_type.as_c_type(), byref(c_clock))
-        Return.check(ret)
-        return c_clock.value
+        scratch = self._scratch
+        fn = self._fn_get_max_clock_info
+        ret = fn(self.handle, clock_type.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 4.304
     def get_applications_clock(self, clock_type: ClockType) -> int:
@@ -416,11 +842,12 @@ class Device:
         @return: the clock in MHz
         @rtype: int
         """
-        c_clock = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetApplicationsClock")
-        ret = fn(self.handle, clock_type.as_c_type(), byref(c_clock))
-        Return.check(ret)
-        return c_clock.value
+        scratch = self._scratch
+        fn = self._fn_get_applications_clock
+        ret = fn(self.handle, clock_type.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 5.319
     def get_default_applications_clock(self, clock_type: ClockType) -> int:
@@ -432,81 +859,49 @@ class Device:
         @return: the default clock in MHz
         @rtype: int
         """
-        c_clock = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetDefaultApplicationsClock")
-        ret = fn(self.handle, clock_type.as_c_type(), byref(c_clock))
-        Return.check(ret)
-        return c_clock.value
+        scratch = self._scratch
+        fn = self._fn_get_default_applications_clock
+        ret = fn(self.handle, clock_type.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 4.304
+    @immutable
     def get_supported_memory_clocks(self) -> List[int]:
-        # first call to get the size
-        c_count = c_uint(0)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetSupportedMemoryClocks")
-        ret = fn(self.handle, byref(c_count), None)
-
-        result = Return(ret)
-        if result == Return.SUCCESS:
-            # special case, no clocks
-            return []
-        elif result == Return.ERROR_INSUFFICIENT_SIZE:
-            # typical case
-            clocks_array = c_uint * c_count.value
-            c_clocks = clocks_array()
-
-            # make the call again
-            ret = fn(self.handle, byref(c_count), c_clocks)
-            Return.check(ret)
-            return list(c_clocks)
-        else:
-            # error case
-            raise NVMLError.from_return(ret)
+        return self._get_array(self._fn_get_supported_memory_clocks, c_uint,
+                               max_count=Device.MAX_SUPPORTED_CLOCKS)
 
     # Added in 4.304
+    @immutable
     def get_supported_graphics_clocks(self, memory_clock_mhz: int) -> List[int]:
-        # first call to get the size
-        c_count = c_uint(0)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetSupportedGraphicsClocks")
-        ret = fn(self.handle, c_uint(memory_clock_mhz), byref(c_count), None)
-        result = Return(ret)
-
-        if result == Return.SUCCESS:
-            # special case, no clocks
-            return []
-        elif result == Return.ERROR_INSUFFICIENT_SIZE:
-            # typical case
-            clocks_array = c_uint * c_count.value
-            c_clocks = clocks_array()
-
-            # make the call again
-            ret = fn(self.handle, c_uint(memory_clock_mhz), byref(c_count), c_clocks)
-            Return.check(ret)
-            return list(c_clocks)
-        else:
-            # error case
-            raise NVMLError(ret)
+        return self._get_array(self._fn_get_supported_graphics_clocks, c_uint, memory_clock_mhz,
+                               max_count=Device.MAX_SUPPORTED_CLOCKS)
 
     def get_fan_speed(self) -> int:
-        c_speed = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetFanSpeed_v2")
-        fan = c_uint(0)
-        ret = fn(self.handle, fan, byref(c_speed))
-        Return.check(ret)
-        return c_speed.value
+        scratch = self._scratch
+        fn = self._fn_get_fan_speed
+        ret = fn(self.handle, 0, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
+    @cached_for("TEMPERATURE_TTL")
     def get_temperature(self, sensor: TemperatureSensors) -> int:
-        c_temp = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetTemperature")
-        ret = fn(self.handle, sensor.as_c_type(), byref(c_temp))
-        Return.check(ret)
-        return c_temp.value
+        scratch = self._scratch
+        fn = self._fn_get_temperature
+        ret = fn(self.handle, sensor.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     def get_temperature_threshold(self, threshold: TemperatureThresholds) -> int:
-        c_temp = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetTemperatureThreshold")
-        ret = fn(self.handle, threshold.as_c_type(), byref(c_temp))
-        Return.check(ret)
-        return c_temp.value
+        scratch = self._scratch
+        fn = self._fn_get_temperature_threshold
+        ret = fn(self.handle, threshold.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # DEPRECATED use nvmlDeviceGetPerformanceState
     def get_power_state(self) -> PowerState:
@@ -515,49 +910,56 @@ class Device:
             deprecated
             use :func:`Device.get_performance_state`
         """
-        power_state = PowerState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPowerState")
-        ret = fn(self.handle, byref(power_state))
-        Return.check(ret)
-        return PowerState(power_state.value)
+        scratch = self._scratch
+        fn = self._fn_get_power_state
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return PowerState(scratch.uint.value)
 
     def get_performance_state(self) -> PowerState:
-        performance_state = PowerState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPerformanceState")
-        ret = fn(self.handle, byref(performance_state))
-        Return.check(ret)
-        return PowerState(performance_state.value)
+        scratch = self._scratch
+        fn = self._fn_get_performance_state
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return PowerState(scratch.uint.value)
 
     def get_power_management_mode(self) -> EnableState:
-        pcap_mode = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPowerManagementMode")
-        ret = fn(self.handle, byref(pcap_mode))
-        Return.check(ret)
-        return EnableState(pcap_mode.value)
+        scratch = self._scratch
+        fn = self._fn_get_power_management_mode
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value)
 
     def get_power_management_limit(self) -> int:
-        c_limit = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPowerManagementLimit")
-        ret = fn(self.handle, byref(c_limit))
-        Return.check(ret)
-        return c_limit.value
+        scratch = self._scratch
+        fn = self._fn_get_power_management_limit
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 4.304
+    @immutable
     def get_power_management_limit_constraints(self) -> Tuple[int, int]:
-        c_minLimit = c_uint()
-        c_maxLimit = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPowerManagementLimitConstraints")
-        ret = fn(self.handle, byref(c_minLimit), byref(c_maxLimit))
-        Return.check(ret)
-        return c_minLimit.value, c_maxLimit.value
+        scratch = self._scratch
+        fn = self._fn_get_power_management_limit_constraints
+        ret = fn(self.handle, scratch.uint_ref, scratch.uint2_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value, scratch.uint2.value
 
     # Added in 4.304
+    @immutable
     def get_power_management_default_limit(self) -> int:
-        c_limit = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPowerManagementDefaultLimit")
-        ret = fn(self.handle, byref(c_limit))
-        Return.check(ret)
-        return c_limit.value
+        scratch = self._scratch
+        fn = self._fn_get_power_management_default_limit
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 331
     def get_enforced_power_limit(self) -> int:
@@ -573,27 +975,31 @@ class Device:
 
         """
 
-        c_limit = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetEnforcedPowerLimit")
-        ret = fn(self.handle, byref(c_limit))
-        Return.check(ret)
-        return c_limit.value
+        scratch = self._scratch
+        fn = self._fn_get_enforced_power_limit
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
+    @cached_for("POWER_USAGE_TTL")
     def get_power_usage(self) -> int:
-        milli_watts = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPowerUsage")
-        ret = fn(self.handle, byref(milli_watts))
-        Return.check(ret)
-        return milli_watts.value
+        scratch = self._scratch
+        fn = self._fn_get_power_usage
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 4.304
+    @cached_for("PAIRED_GETTER_TTL")
     def get_gpu_operation_mode(self) -> Tuple[GpuOperationMode, GpuOperationMode]:
-        c_currState = GpuOperationMode.c_type()
-        c_pendingState = GpuOperationMode.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetGpuOperationMode")
-        ret = fn(self.handle, byref(c_currState), byref(c_pendingState))
-        Return.check(ret)
-        return GpuOperationMode(c_currState.value), GpuOperationMode(c_pendingState.value)
+        scratch = self._scratch
+        fn = self._fn_get_gpu_operation_mode
+        ret = fn(self.handle, scratch.uint_ref, scratch.uint2_ref)
+        if ret:
+            Return.check(ret)
+        return GpuOperationMode(scratch.uint.value), GpuOperationMode(scratch.uint2.value)
 
     # Added in 4.304
     def get_current_gpu_operation_mode(self) -> GpuOperationMode:
@@ -605,32 +1011,36 @@ class Device:
 
     def get_memory_info(self) -> Memory:
         c_memory = Memory()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetMemoryInfo")
+        fn = self._fn_get_memory_info
         ret = fn(self.handle, byref(c_memory))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_memory
 
     def get_bar1_memory_info(self) -> BAR1Memory:
         c_bar1_memory = BAR1Memory()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetBAR1MemoryInfo")
+        fn = self._fn_get_bar1_memory_info
         ret = fn(self.handle, byref(c_bar1_memory))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_bar1_memory
 
     def get_compute_mode(self) -> ComputeMode:
-        c_mode = ComputeMode.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetComputeMode")
-        ret = fn(self.handle, byref(c_mode))
-        Return.check(ret)
-        return ComputeMode(c_mode.value)
+        scratch = self._scratch
+        fn = self._fn_get_compute_mode
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return ComputeMode(scratch.uint.value)
 
+    @cached_for("PAIRED_GETTER_TTL")
     def get_ecc_mode(self) -> Tuple[EnableState, EnableState]:
-        c_currState = EnableState.c_type()
-        c_pendingState = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetEccMode")
-        ret = fn(self.handle, byref(c_currState), byref(c_pendingState))
-        Return.check(ret)
-        return EnableState(c_currState.value), EnableState(c_pendingState.value)
+        scratch = self._scratch
+        fn = self._fn_get_ecc_mode
+        ret = fn(self.handle, scratch.uint_ref, scratch.uint2_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value), EnableState(scratch.uint2.value)
 
     # added to API
     def get_current_ecc_mode(self) -> EnableState:
@@ -641,71 +1051,155 @@ class Device:
         return self.get_ecc_mode()[1]
 
     def get_total_ecc_errors(self, error_type: MemoryErrorType, counter_type: EccCounterType) -> int:
-        c_count = c_ulonglong()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetTotalEccErrors")
-        ret = fn(self.handle, error_type.as_c_type(),
-                 counter_type.as_c_type(), byref(c_count))
-        Return.check(ret)
-        return c_count.value
+        scratch = self._scratch
+        fn = self._fn_get_total_ecc_errors
+        ret = fn(self.handle, error_type.value,
+                 counter_type.value, scratch.ulonglong_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.ulonglong.value
 
     # This is deprecated, instead use nvmlDeviceGetMemoryErrorCounter
     def get_detailed_ecc_errors(self, error_type: MemoryErrorType,
                                 counter_type: EccCounterType) -> EccErrorCounts:
         """@deprecated: This is deprecated, instead use nvmlDeviceGetMemoryErrorCounter"""
         c_counts = EccErrorCounts()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetDetailedEccErrors")
-        ret = fn(self.handle, error_type.as_c_type(),
-                 counter_type.as_c_type(), byref(c_counts))
-        Return.check(ret)
+        fn = self._fn_get_detailed_ecc_errors
+        ret = fn(self.handle, error_type.value,
+                 counter_type.value, byref(c_counts))
+        if ret:
+            Return.check(ret)
         return c_counts
 
     # Added in 4.304
     def get_memory_error_counter(self, error_type: MemoryErrorType,
                                  counter_type: EccCounterType, location_type: MemoryLocation) -> int:
-        c_count = c_ulonglong()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetMemoryErrorCounter")
-        ret = fn(self.handle, error_type.as_c_type(), counter_type.as_c_type(),
-                 location_type.as_c_type(), byref(c_count))
-        Return.check(ret)
-        return c_count.value
+        scratch = self._scratch
+        fn = self._fn_get_memory_error_counter
+        ret = fn(self.handle, error_type.value, counter_type.value,
+                 location_type.value, scratch.ulonglong_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.ulonglong.value
 
     def get_utilization_rates(self) -> Utilization:
+        if self.UTILIZATION_TTL > 0:
+            # every caller gets its own structure, modifying it doesn't change the shared reading
+            return Utilization(*self._get_shared_utilization_rates())
         c_util = Utilization()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetUtilizationRates")
+        fn = self._fn_get_utilization_rates
         ret = fn(self.handle, byref(c_util))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_util
 
+    @cached_for("UTILIZATION_TTL")
+    def _get_shared_utilization_rates(self) -> Tuple[int, int]:
+        c_util = self._scratch.utilization
+        fn = self._fn_get_utilization_rates
+        ret = fn(self.handle, byref(c_util))
+        if ret:
+            Return.check(ret)
+        return c_util.gpu, c_util.memory
+
+    def snapshot(self, fields: Iterable[str] = _SNAPSHOT_FIELDS) -> DeviceSnapshot:
+        """
+        Samples the commonly polled telemetry of the device in one go.
+        Equivalent to calling get_utilization_rates, get_memory_info, get_temperature,
+        get_power_usage, get_clock_info and get_performance_state individually,
+        but without the per-getter overhead.
+        @param fields: names of the DeviceSnapshot fields to query, defaults to all
+        @type fields: Iterable[str]
+        @return: the sampled values, fields that were not requested are None
+        @rtype: DeviceSnapshot
+        """
+        if fields is not _SNAPSHOT_FIELDS:
+            fields = frozenset(fields)
+        unknown = fields - _SNAPSHOT_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown snapshot fields: {', '.join(sorted(unknown))}")
+        handle = self.handle
+        scratch = self._scratch
+        check = Return.check
+        values = {}
+
+        if "gpu_utilization" in fields or "memory_utilization" in fields:
+            c_util = scratch.utilization
+            ret = self._fn_get_utilization_rates(handle, byref(c_util))
+            if ret:
+                check(ret)
+            values["gpu_utilization"] = c_util.gpu
+            values["memory_utilization"] = c_util.memory
+        if "memory_total" in fields or "memory_used" in fields:
+            c_memory = scratch.memory
+            ret = self._fn_get_memory_info(handle, byref(c_memory))
+            if ret:
+                check(ret)
+            values["memory_total"] = c_memory.total
+            values["memory_used"] = c_memory.used
+
+        c_value = scratch.uint
+        p_value = scratch.uint_ref
+        if "temperature" in fields:
+            ret = self._fn_get_temperature(handle, _TEMPERATURE_GPU, p_value)
+            if ret:
+                check(ret)
+            values["temperature"] = c_value.value
+        if "power_usage" in fields:
+            ret = self._fn_get_power_usage(handle, p_value)
+            if ret:
+                check(ret)
+            values["power_usage"] = c_value.value
+        if "graphics_clock" in fields or "sm_clock" in fields or "memory_clock" in fields:
+            get_clock_info = self._fn_get_clock_info
+            for name, clock_type in _SNAPSHOT_CLOCKS:
+                if name in fields:
+                    ret = get_clock_info(handle, clock_type, p_value)
+                    if ret:
+                        check(ret)
+                    values[name] = c_value.value
+        if "performance_state" in fields:
+            ret = self._fn_get_performance_state(handle, p_value)
+            if ret:
+                check(ret)
+            values["performance_state"] = PowerState(c_value.value)
+
+        return DeviceSnapshot(**{name: values[name] for name in fields})
+
+    @cached_for("UTILIZATION_TTL")
     def get_encoder_utilization(self) -> Tuple[int, int]:
-        c_util = c_uint()
-        c_samplingPeriod = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetEncoderUtilization")
-        ret = fn(self.handle, byref(c_util), byref(c_samplingPeriod))
-        Return.check(ret)
-        return c_util.value, c_samplingPeriod.value
+        scratch = self._scratch
+        fn = self._fn_get_encoder_utilization
+        ret = fn(self.handle, scratch.uint_ref, scratch.uint2_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value, scratch.uint2.value
 
+    @cached_for("UTILIZATION_TTL")
     def get_decoder_utilization(self) -> Tuple[int, int]:
-        c_util = c_uint()
-        c_samplingPeriod = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetDecoderUtilization")
-        ret = fn(self.handle, byref(c_util), byref(c_samplingPeriod))
-        Return.check(ret)
-        return c_util.value, c_samplingPeriod.value
+        scratch = self._scratch
+        fn = self._fn_get_decoder_utilization
+        ret = fn(self.handle, scratch.uint_ref, scratch.uint2_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value, scratch.uint2.value
 
     def get_pcie_replay_counter(self) -> int:
-        c_replay = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPcieReplayCounter")
-        ret = fn(self.handle, byref(c_replay))
-        Return.check(ret)
-        return c_replay.value
+        scratch = self._scratch
+        fn = self._fn_get_pcie_replay_counter
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
+    @cached_for("PAIRED_GETTER_TTL")
     def get_driver_model(self) -> Tuple[DriverModel, DriverModel]:
-        c_currModel = DriverModel.c_type()
-        c_pendingModel = DriverModel.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetDriverModel")
-        ret = fn(self.handle, byref(c_currModel), byref(c_pendingModel))
-        Return.check(ret)
-        return DriverModel(c_currModel.value), DriverModel(c_pendingModel.value)
+        scratch = self._scratch
+        fn = self._fn_get_driver_model
+        ret = fn(self.handle, scratch.uint_ref, scratch.uint2_ref)
+        if ret:
+            Return.check(ret)
+        return DriverModel(scratch.uint.value), DriverModel(scratch.uint2.value)
 
     # added to API
     def get_current_driver_model(self) -> DriverModel:
@@ -716,14 +1210,21 @@ class Device:
         return self.get_driver_model()[1]
 
     # Added in 2.285
+    @immutable
     def get_vbios_version(self) -> str:
-        c_version = create_string_buffer(Device.VBIOS_VERSION_BUFFER_SIZE)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetVbiosVersion")
-        ret = fn(self.handle, c_version, c_uint(Device.VBIOS_VERSION_BUFFER_SIZE))
-        Return.check(ret)
-        return c_version.value.decode("UTF-8")
+        c_version = (c_char * Device.VBIOS_VERSION_BUFFER_SIZE)()
+        fn = self._fn_get_vbios_version
+        ret = fn(self.handle, c_version, Device.VBIOS_VERSION_BUFFER_SIZE)
+        if ret:
+            Return.check(ret)
+        return c_version.value.decode()
+
+    def _get_array(self, fn, item_type, *args, max_count: int = 0, unpack: struct.Struct = None) -> list:
+        """Calls :func:`get_array` with the device handle and the device's size hints."""
+        return get_array(fn, item_type, self._array_size_hints, self.handle, *args,
+                         max_count=max_count, unpack=unpack)
 
-    def _get_running_processes(self, fn) -> List[ProcessInfo]:
+    def _get_running_processes(self, fn) -> List[RunningProcess]:
         """
 
         Note:
@@ -741,40 +1242,14 @@ class Device:
         Returns:
 
         """
-        # first call to get the size
-        c_count = c_uint(0)
-        ret = fn(self.handle, byref(c_count), None)
-        result = Return(ret)
-
-        if result == Return.SUCCESS:
-            # special case, no running processes
-            return []
-        elif result == Return.ERROR_INSUFFICIENT_SIZE:
-            # typical case
-            # oversize the array incase more processes are created
-            c_count.value = c_count.value * 2 + 5
-            proc_array = ProcessInfo * c_count.value
-            c_procs = proc_array()
-
-            # make the call again
-            ret = fn(self.handle, byref(c_count), c_procs)
-            Return.check(ret)
-
-            procs = []
-            for i in range(c_count.value):
-                # use an alternative struct for this object
-                obj: ProcessInfo = c_procs[i].get_friendly_object()
-                if obj.usedGpuMemory == VALUE_NOT_AVAILABLE_ulonglong:
-                    # special case for WDDM on Windows, see comment above
-                    obj.usedGpuMemory = None
-                procs.append(obj)
-            return procs
-        else:
-            # error case
-            raise NVMLError(ret)
+        procs = self._get_array(fn, ProcessInfo, max_count=Device.MAX_RUNNING_PROCESSES, unpack=_PROCESS_INFO)
+        # special case for WDDM on Windows, see comment above
+        not_available = VALUE_NOT_AVAILABLE_ulonglong.value
+        return [RunningProcess(pid, None if used_memory == not_available else used_memory)
+                for pid, used_memory in procs]
 
     # Added in 2.285
-    def get_compute_running_processes(self) -> List[ProcessInfo]:
+    def get_compute_running_processes(self) -> List[RunningProcess]:
         """
 
         Note:
@@ -789,10 +1264,10 @@ class Device:
         Returns:
 
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceGetComputeRunningProcesses")
+        fn = self._fn_get_compute_running_processes
         return self._get_running_processes(fn)
 
-    def get_graphics_running_processes(self) -> List[ProcessInfo]:
+    def get_graphics_running_processes(self) -> List[RunningProcess]:
         """
 
         Note:
@@ -808,9 +1283,10 @@ class Device:
         Returns:
 
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceGetGraphicsRunningProcesses")
+        fn = self._fn_get_graphics_running_processes
         return self._get_running_processes(fn)
 
+    @cached_for("PAIRED_GETTER_TTL")
     def get_auto_boosted_clocks_enabled(self) -> Tuple[EnableState, EnableState]:
         """
 
@@ -818,12 +1294,12 @@ class Device:
         @rtype:
         @raise NVMLErrorNotSupported: if hardware doesn't support setting auto boosted clocks
         """
-        c_isEnabled = EnableState.c_type()
-        c_defaultIsEnabled = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetAutoBoostedClocksEnabled")
-        ret = fn(self.handle, byref(c_isEnabled), byref(c_defaultIsEnabled))
-        Return.check(ret)
-        return EnableState(c_isEnabled.value), EnableState(c_defaultIsEnabled.value)
+        scratch = self._scratch
+        fn = self._fn_get_auto_boosted_clocks_enabled
+        ret = fn(self.handle, scratch.uint_ref, scratch.uint2_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value), EnableState(scratch.uint2.value)
 
     def set_auto_boosted_clocks_enabled(self, enabled: EnableState) -> None:
         """
@@ -834,9 +1310,11 @@ class Device:
         @rtype:
         @raise NVMLErrorNotSupported: if hardware doesn't support setting auto boosted clocks
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceSetAutoBoostedClocksEnabled")
-        ret = fn(self.handle, enabled.as_c_type())
-        Return.check(ret)
+        fn = self._fn_set_auto_boosted_clocks_enabled
+        ret = fn(self.handle, enabled.value)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_auto_boosted_clocks_enabled")
 
     def set_default_auto_boosted_clocks_enabled(self, enabled: EnableState, flags: int = 0) -> None:
         """
@@ -849,10 +1327,11 @@ class Device:
         @rtype:
         @raise NVMLErrorNotSupported: if hardware doesn't support setting auto boosted clocks
         """
-        fn = self.lib.get_function_pointer(
-            "nvmlDeviceSetDefaultAutoBoostedClocksEnabled")
-        ret = fn(self.handle, enabled.as_c_type(), c_uint(flags))
-        Return.check(ret)
+        fn = self._fn_set_default_auto_boosted_clocks_enabled
+        ret = fn(self.handle, enabled.value, flags)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_auto_boosted_clocks_enabled")
 
     # Added in 4.304
     def reset_applications_clocks(self) -> None:
@@ -866,9 +1345,12 @@ class Device:
         above base clocks as thermal limits allow.
         FERMI_OR_NEWER_GF
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceResetApplicationsClocks")
+        fn = self._fn_reset_applications_clocks
         ret = fn(self.handle)
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
+        self._invalidate("get_clock")
+        self._invalidate("get_clock_info")
 
     #################################
     #         Event Methods         #
@@ -897,22 +1379,40 @@ class Device:
         @return:
         @rtype:
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceRegisterEvents")
-        event_set = EventSet()
-        ret = fn(self.handle, event_types.as_c_type(), event_set.handle)
-        Return.check(ret)
+        fn = self._fn_register_events
+        event_set = EventSet(self.lib)
+        ret = fn(self.handle, event_types.value, event_set.handle)
+        if ret:
+            Return.check(ret)
         return event_set
 
+    def start_event_polling(self, event_types: EventType = EventType.NONE,
+                            snapshot_hz: float = 10.0) -> SnapshotCollector:
+        """
+        Starts refreshing a snapshot of this device on a background thread,
+        periodically and whenever one of the given events occurs.
+        Stop it with SnapshotCollector.stop.
+        @param event_types: events that trigger an immediate refresh
+        @type event_types: EventType
+        @param snapshot_hz: how often the snapshot is refreshed without events
+        @type snapshot_hz: float
+        @return: the running collector, its latest property holds the snapshot
+        @rtype: SnapshotCollector
+        """
+        return SnapshotCollector(self, event_types, snapshot_hz).start()
+
     # Added in 2.285
+    @immutable
     def get_supported_event_types(self) -> EventType:
         """Returns information about events supported on device
         FERMI_OR_NEWER
         Events are not supported on Windows. So this function returns an empty mask in eventTypes on Windows."""
-        c_eventTypes = c_ulonglong()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetSupportedEventTypes")
-        ret = fn(self.handle, byref(c_eventTypes))
-        Return.check(ret)
-        return EventType(c_eventTypes.value)
+        scratch = self._scratch
+        fn = self._fn_get_supported_event_types
+        ret = fn(self.handle, scratch.ulonglong_ref)
+        if ret:
+            Return.check(ret)
+        return EventType(scratch.ulonglong.value)
 
     ### TODO:
     # Added in 3.295
@@ -924,178 +1424,192 @@ class Device:
         @return:
         @rtype:
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceOnSameBoard")
+        fn = self._fn_on_same_board
         onSameBoard = c_int()
         ret = fn(self.handle, device_2.handle, byref(onSameBoard))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return onSameBoard.value != 0
 
     # Added in 3.295
     def get_curr_pcie_link_generation(self) -> int:
-        fn = self.lib.get_function_pointer("nvmlDeviceGetCurrPcieLinkGeneration")
-        gen = c_uint()
-        ret = fn(self.handle, byref(gen))
-        Return.check(ret)
-        return gen.value
+        fn = self._fn_get_curr_pcie_link_generation
+        scratch = self._scratch
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 3.295
+    @immutable
     def get_max_pcie_link_generation(self) -> int:
-        fn = self.lib.get_function_pointer("nvmlDeviceGetMaxPcieLinkGeneration")
-        gen = c_uint()
-        ret = fn(self.handle, byref(gen))
-        Return.check(ret)
-        return gen.value
+        fn = self._fn_get_max_pcie_link_generation
+        scratch = self._scratch
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 3.295
     def get_curr_pcie_link_width(self) -> int:
-        fn = self.lib.get_function_pointer("nvmlDeviceGetCurrPcieLinkWidth")
-        width = c_uint()
-        ret = fn(self.handle, byref(width))
-        Return.check(ret)
-        return width.value
+        fn = self._fn_get_curr_pcie_link_width
+        scratch = self._scratch
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 3.295
+    @immutable
     def get_max_pcie_link_width(self) -> int:
-        fn = self.lib.get_function_pointer("nvmlDeviceGetMaxPcieLinkWidth")
-        width = c_uint()
-        ret = fn(self.handle, byref(width))
-        Return.check(ret)
-        return width.value
+        fn = self._fn_get_max_pcie_link_width
+        scratch = self._scratch
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 4.304
+    @immutable
     def get_supported_clocks_throttle_reasons(self) -> int:
-        c_reasons = c_ulonglong()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetSupportedClocksThrottleReasons")
-        ret = fn(self.handle, byref(c_reasons))
-        Return.check(ret)
-        return c_reasons.value
+        scratch = self._scratch
+        fn = self._fn_get_supported_clocks_throttle_reasons
+        ret = fn(self.handle, scratch.ulonglong_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.ulonglong.value
 
     # Added in 4.304
     def get_current_clocks_throttle_reasons(self) -> int:
-        c_reasons = c_ulonglong()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetCurrentClocksThrottleReasons")
-        ret = fn(self.handle, byref(c_reasons))
-        Return.check(ret)
-        return c_reasons.value
+        scratch = self._scratch
+        fn = self._fn_get_current_clocks_throttle_reasons
+        ret = fn(self.handle, scratch.ulonglong_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.ulonglong.value
 
     # Added in 5.319
+    @immutable
     def get_index(self) -> int:
-        fn = self.lib.get_function_pointer("nvmlDeviceGetIndex")
-        c_index = c_uint()
-        ret = fn(self.handle, byref(c_index))
-        Return.check(ret)
-        return c_index.value
+        fn = self._fn_get_index
+        scratch = self._scratch
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     # Added in 5.319
     def get_accounting_mode(self) -> EnableState:
-        c_mode = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetAccountingMode")
-        ret = fn(self.handle, byref(c_mode))
-        Return.check(ret)
-        return EnableState(c_mode.value)
+        scratch = self._scratch
+        fn = self._fn_get_accounting_mode
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value)
 
     def set_accounting_mode(self, mode: EnableState) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetAccountingMode")
-        ret = fn(self.handle, mode.as_c_type())
-        Return.check(ret)
+        fn = self._fn_set_accounting_mode
+        ret = fn(self.handle, mode.value)
+        if ret:
+            Return.check(ret)
 
     def clear_accounting_pids(self) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceClearAccountingPids")
+        fn = self._fn_clear_accounting_pids
         ret = fn(self.handle)
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
 
     def get_accounting_stats(self, pid: int) -> AccountingStats:
         stats = AccountingStats()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetAccountingStats")
-        ret = fn(self.handle, c_uint(pid), byref(stats))
-        Return.check(ret)
+        fn = self._fn_get_accounting_stats
+        ret = fn(self.handle, pid, byref(stats))
+        if ret:
+            Return.check(ret)
         if stats.maxMemoryUsage == VALUE_NOT_AVAILABLE_ulonglong:
             # special case for WDDM on Windows, see comment above
             stats.maxMemoryUsage = None
         return stats
 
+    @immutable
     def get_accounting_buffer_size(self) -> int:
-        bufferSize = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetAccountingBufferSize")
-        ret = fn(self.handle, byref(bufferSize))
-        Return.check(ret)
-        return bufferSize.value
+        scratch = self._scratch
+        fn = self._fn_get_accounting_buffer_size
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     def get_accounting_pids(self) -> List[int]:
-        count = c_uint(self.get_accounting_buffer_size())
-        pids = (c_uint * count.value)()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetAccountingPids")
-        ret = fn(self.handle, byref(count), pids)
-        Return.check(ret)
-        return list(pids)
+        return self._get_array(self._fn_get_accounting_pids, c_uint)
 
     def get_retired_pages(self, source_filter: PageRetirementCause) -> List[int]:
-        c_source = source_filter.as_c_type()
-        c_count = c_uint(0)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetRetiredPages")
-
-        # First call will get the size
-        ret = fn(self.handle, c_source, byref(c_count), None)
-        result = Return(ret)
-
-        Return.check(ret)
-
-        # # this should only fail with insufficient size
-        # if ((result != Return.SUCCESS) and
-        #         (result != Return.ERROR_INSUFFICIENT_SIZE)):
-        #     raise NVMLError(ret)
-
-        # call again with a buffer
-        # oversize the array for the rare cases where additional pages
-        # are retired between NVML calls
-        c_count.value = c_count.value * 2 + 5
-        page_array = c_ulonglong * c_count.value
-        c_pages = page_array()
-        ret = fn(self.handle, c_source, byref(c_count), c_pages)
-        Return.check(ret)
-        return list(c_pages)
+        return self._get_array(self._fn_get_retired_pages, c_ulonglong, source_filter.value,
+                               max_count=Device.MAX_RETIRED_PAGES)
 
     def get_retired_pages_pending_status(self) -> EnableState:
-        c_pending = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetRetiredPagesPendingStatus")
-        ret = fn(self.handle, byref(c_pending))
-        Return.check(ret)
-        return EnableState(c_pending.value)
+        scratch = self._scratch
+        fn = self._fn_get_retired_pages_pending_status
+        ret = fn(self.handle, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value)
 
     def get_api_restriction(self, api_type: RestrictedAPI) -> EnableState:
-        c_permission = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetAPIRestriction")
-        ret = fn(self.handle, api_type.as_c_type(), byref(c_permission))
-        Return.check(ret)
-        return EnableState(c_permission.value)
+        scratch = self._scratch
+        fn = self._fn_get_api_restriction
+        ret = fn(self.handle, api_type.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return EnableState(scratch.uint.value)
 
     def get_bridge_chip_info(self) -> BridgeChipHierarchy:
         bridge_hierarchy = BridgeChipHierarchy()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetBridgeChipInfo")
+        fn = self._fn_get_bridge_chip_info
         ret = fn(self.handle, byref(bridge_hierarchy))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return bridge_hierarchy
 
-    def _get_raw_samples(self, sampling_type: SamplingType, time_stamp: int) -> Tuple[ValueType, List[RawSample]]:
-        c_sampling_type = sampling_type.as_c_type()
-        c_time_stamp = c_ulonglong(time_stamp)
-        c_sample_count = c_uint(0)
+    def _get_raw_samples(self, sampling_type: SamplingType, time_stamp: int,
+                         out: Array = None) -> Tuple[ValueType, List[RawSample]]:
+        """
+        Gets the samples recorded since time_stamp.
+        Unless out is given, the samples are written to a per thread buffer, which is sized once
+        and reused by later calls for the same sampling type.
+        The returned samples refer to that buffer and are only valid until the next call.
+        @param out: optional array of RawSample to fill
+        """
         c_sample_value_type = ValueType.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetSamples")
-
-        # First Call gets the size
-        ret = fn(self.handle, c_sampling_type, c_time_stamp,
-                 byref(c_sample_value_type), byref(c_sample_count), None)
-        Return.check(ret)
-
-        sampleArray = c_sample_count.value * RawSample
-        c_samples = sampleArray()
-        ret = fn(self.handle, c_sampling_type, c_time_stamp,
-                 byref(c_sample_value_type), byref(c_sample_count), c_samples)
-        Return.check(ret, sampling_type)
+        fn = self._fn__get_raw_samples
+
+        buffers = self._scratch.samples
+        c_samples = out if out is not None else buffers.get(sampling_type)
+        for _ in range(Device.MAX_SAMPLE_ATTEMPTS):
+            if c_samples is None:
+                # First Call gets the size, with headroom for samples recorded in between
+                c_sample_count = c_uint(0)
+                ret = fn(self.handle, sampling_type.value, time_stamp,
+                         byref(c_sample_value_type), byref(c_sample_count), None)
+                if ret:
+                    Return.check(ret)
+                size = c_sample_count.value + c_sample_count.value // 2
+                c_samples = buffers[sampling_type] = (RawSample * size)()
+
+            c_sample_count = c_uint(len(c_samples))
+            ret = fn(self.handle, sampling_type.value, time_stamp,
+                     byref(c_sample_value_type), byref(c_sample_count), c_samples)
+            if ret != _ERROR_INSUFFICIENT_SIZE or out is not None:
+                break
+            # more samples than seen before, size the buffer again
+            c_samples = None
+        if ret == _ERROR_NOT_FOUND:
+            # no samples recorded, the error reports for which sampling type
+            Return.check(ret, sampling_type)
+        elif ret:
+            Return.check(ret)
 
         # keep only c_sample_count first samples; others are invalid
-        valid_samples = list(c_samples)[:c_sample_count.value]
+        valid_samples = c_samples[:c_sample_count.value]
         return ValueType(c_sample_value_type.value), valid_samples
 
     # column oriented
@@ -1106,8 +1620,9 @@ class Device:
     #     return time_stamps, values
 
     # row oriented
-    def get_samples(self, sampling_type: SamplingType, time_stamp: int) -> List[Sample]:
-        value_type, raw_samples = self._get_raw_samples(sampling_type, time_stamp)
+    def get_samples(self, sampling_type: SamplingType, time_stamp: int,
+                    out: Array = None) -> List[Sample]:
+        value_type, raw_samples = self._get_raw_samples(sampling_type, time_stamp, out)
         # time_stamps = [x.timeStamp for x in raw_samples]
         # values = [x.sampleValue.get_value(value_type) for x in raw_samples]
         samples = [Sample(x.timeStamp, x.sampleValue.get_value(value_type)) for x in raw_samples]
@@ -1121,20 +1636,23 @@ class Device:
 
     def get_violation_status(self, perf_policy_type: PerfPolicyType) -> ViolationTime:
         c_violTime = ViolationTime()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetViolationStatus")
+        fn = self._fn_get_violation_status
 
         # Invoke the method to get violation time
-        ret = fn(self.handle, perf_policy_type.as_c_type(), byref(c_violTime))
-        Return.check(ret)
+        ret = fn(self.handle, perf_policy_type.value, byref(c_violTime))
+        if ret:
+            Return.check(ret)
         return c_violTime
 
     def get_pcie_throughput(self, counter: PcieUtilCounter) -> int:
-        c_util = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetPcieThroughput")
-        ret = fn(self.handle, counter.as_c_type(), byref(c_util))
-        Return.check(ret)
-        return c_util.value
+        scratch = self._scratch
+        fn = self._fn_get_pcie_throughput
+        ret = fn(self.handle, counter.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
+    @immutable
     def get_topology_nearest_gpus(self, level: GpuTopologyLevel):
         """
 
@@ -1143,19 +1661,9 @@ class Device:
         @return:
         @rtype: List[Device]
         """
-        c_count = c_uint(0)
-        fn = self.lib.get_function_pointer("nvmlDeviceGetTopologyNearestGpus")
-
-        # First call will get the size
-        ret = fn(self.handle, level.as_c_type(), byref(c_count), None)
-        Return.check(ret)
-
-        # call again with a buffer
-        device_array = CDevicePointer * c_count.value
-        c_devices = device_array()
-        ret = fn(self.handle, level.as_c_type(), byref(c_count), c_devices)
-        Return.check(ret)
-        return [Device(x) for x in c_devices]
+        c_devices = self._get_array(self._fn_get_topology_nearest_gpus, CDevicePointer, level.value,
+                                    max_count=Device.MAX_NEAREST_GPUS)
+        return [Device(self.lib, x) for x in c_devices]
 
     def get_topology_common_ancestor(self, device2: "Device") -> GpuTopologyLevel:
         """
@@ -1165,10 +1673,139 @@ class Device:
         @return:
         @rtype: GpuTopologyLevel
         """
-        c_level = GpuTopologyLevel.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetTopologyCommonAncestor")
-        ret = fn(self.handle, device2.handle, byref(c_level))
-        Return.check(ret)
-        return GpuTopologyLevel(c_level.value)
+        # keyed by address, different Device objects of the same GPU share the cached result
+        return self._get_topology_common_ancestor(cast(device2.handle, c_void_p).value)
+
+    @immutable
+    def _get_topology_common_ancestor(self, address: int) -> GpuTopologyLevel:
+        scratch = self._scratch
+        fn = self._fn_get_topology_common_ancestor
+        ret = fn(self.handle, cast(address, CDevicePointer), scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return GpuTopologyLevel(scratch.uint.value)
+
+
+def _map_devices(fn: Callable[[Device], Any], devices: Iterable[Device], executor: Executor = None) -> List[Any]:
+    """Calls fn for every device, concurrently unless there is only one device.
+    Runs on the given executor, or on a thread per device."""
+    devices = list(devices)
+    if executor is not None:
+        return list(executor.map(fn, devices))
+    if len(devices) <= 1:
+        return [fn(device) for device in devices]
+    with ThreadPoolExecutor(max_workers=len(devices)) as pool:
+        return list(pool.map(fn, devices))
+
+
+def poll_devices(devices: Iterable[Device], fields: Iterable[str] = _SNAPSHOT_FIELDS,
+                 executor: Executor = None) -> List[DeviceSnapshot]:
+    """
+    Takes a snapshot of several devices concurrently.
+    NVML calls release the GIL, so the calls to different devices overlap
+    instead of being issued one after another.
+    @param devices: the devices to poll
+    @type devices: Iterable[Device]
+    @param fields: names of the DeviceSnapshot fields to query, defaults to all
+    @type fields: Iterable[str]
+    @param executor: executor to run the snapshots on; when polling repeatedly,
+        pass a long-lived executor to avoid starting new threads on every poll
+    @type executor: Executor
+    @return: one snapshot per device, in the order of devices
+    @rtype: List[DeviceSnapshot]
+    """
+    fields = frozenset(fields)
+    return _map_devices(lambda device: device.snapshot(fields), devices, executor)
+
+
+def poll_getters(devices: Iterable[Device], getters: Iterable[str],
+                 executor: Executor = None) -> List[Dict[str, Any]]:
+    """
+    Calls getters without arguments on several devices concurrently,
+    like :func:`poll_devices` but for getters that are not part of a snapshot.
+    @param devices: the devices to poll
+    @type devices: Iterable[Device]
+    @param getters: names of the Device getters to call, e.g. "get_fan_speed";
+        only public methods starting with ``get_`` are accepted
+    @type getters: Iterable[str]
+    @param executor: executor to run the getters on; when polling repeatedly,
+        pass a long-lived executor to avoid starting new threads on every poll
+    @type executor: Executor
+    @return: for every device, in the order of devices, the results by getter name
+    @rtype: List[Dict[str, Any]]
+    """
+    getters = list(getters)
+    # only getters, names like "reset_applications_clocks" would change the state of every device
+    unknown = [name for name in getters
+               if not name.startswith("get_") or not callable(getattr(Device, name, None))]
+    if unknown:
+        raise ValueError(f"Unknown getters: {', '.join(unknown)}")
+
+    def poll(device: Device) -> Dict[str, Any]:
+        return {name: getattr(device, name)() for name in getters}
 
+    return _map_devices(poll, devices, executor)
 
+
+def poll_energy_consumption(devices: Iterable[Device]) -> List[int]:
+    """
+    Retrieves the total energy consumption of several devices in millijoules (mJ).
+    Equivalent to calling :func:`Device.get_total_energy_consumption` for every device,
+    but with the function pointer and output buffer set up once for all devices.
+
+    VOLTA_OR_NEWER
+    @param devices: the devices to poll
+    @type devices: Iterable[Device]
+    @return: energy consumption of every device, in the order of devices
+    @rtype: List[int]
+    """
+    devices = list(devices)
+    if not devices:
+        return []
+    fn = devices[0]._fn_get_total_energy_consumption
+    check = Return.check
+    energy = c_ulonglong()
+    p_energy = byref(energy)
+    consumption = [0] * len(devices)
+    for i, device in enumerate(devices):
+        ret = fn(device.handle, p_energy)
+        if ret:
+            check(ret)
+        consumption[i] = energy.value
+    return consumption
+
+
+def poll_violation_status(devices: Iterable[Device],
+                          perf_policy_types: Iterable[PerfPolicyType]) -> List[List[Tuple[int, int]]]:
+    """
+    Retrieves the violation times of several devices for several perf policies.
+    Equivalent to calling :func:`Device.get_violation_status` for every device and policy,
+    but with the function pointer and output buffer set up once for all calls.
+
+    KEPLER_OR_NEWER
+    @param devices: the devices to poll
+    @type devices: Iterable[Device]
+    @param perf_policy_types: the policies to query for every device
+    @type perf_policy_types: Iterable[PerfPolicyType]
+    @return: for every device, in the order of devices, the (referenceTime, violationTime)
+        of every policy, in the order of perf_policy_types
+    @rtype: List[List[Tuple[int, int]]]
+    """
+    devices = list(devices)
+    if not devices:
+        return []
+    policies = [perf_policy_type.value for perf_policy_type in perf_policy_types]
+    fn = devices[0]._fn_get_violation_status
+    check = Return.check
+    violation_time = ViolationTime()
+    statuses = [None] * len(devices)
+    for i, device in enumerate(devices):
+        handle = device.handle
+        status = [None] * len(policies)
+        for j, policy in enumerate(policies):
+            ret = fn(handle, policy, violation_time)
+            if ret:
+                check(ret)
+            status[j] = (violation_time.referenceTime, violation_time.violationTime)
+        statuses[i] = status
+    return statuses
@@ -25,59 +25,49 @@ class Return(UIntEnum):
     ERROR_UNKNOWN = 999
 
     def __str__(self):
-        errcode_to_string = {
-            Return.ERROR_UNINITIALIZED: "Uninitialized",
-            Return.ERROR_INVALID_ARGUMENT: "Invalid Argument",
-            Return.ERROR_NOT_SUPPORTED: "Not Supported",
-            Return.ERROR_NO_PERMISSION: "Insufficient Permissions",
-            Return.ERROR_ALREADY_INITIALIZED: "Already Initialized",
-            Return.ERROR_NOT_FOUND: "Not Found",
-            Return.ERROR_INSUFFICIENT_SIZE: "Insufficient Size",
-            Return.ERROR_INSUFFICIENT_POWER: "Insufficient External Power",
-            Return.ERROR_DRIVER_NOT_LOADED: "Driver Not Loaded",
-            Return.ERROR_TIMEOUT: "Timeout",
-            Return.ERROR_IRQ_ISSUE: "Interrupt Request Issue",
-            Return.ERROR_LIBRARY_NOT_FOUND: "NVML Shared Library Not Found",
-            Return.ERROR_FUNCTION_NOT_FOUND: "Function Not Found",
-            Return.ERROR_CORRUPTED_INFOROM: "Corrupted infoROM",
-            Return.ERROR_GPU_IS_LOST: "GPU is lost",
-            Return.ERROR_RESET_REQUIRED: "GPU requires restart",
-            Return.ERROR_OPERATING_SYSTEM: "The operating system has blocked the request.",
-            Return.ERROR_LIB_RM_VERSION_MISMATCH: "RM has detected an NVML/RM version mismatch.",
-            Return.ERROR_UNKNOWN: "Unknown Error",
-        }
-        return errcode_to_string[self]
+        return _ERROR_STRINGS[self]
 
     def get_exception(self):
-        error2exception = {
-            Return.ERROR_UNINITIALIZED: NVMLErrorUninitialized,
-            Return.ERROR_INVALID_ARGUMENT: NVMLErrorInvalidArgument,
-            Return.ERROR_NOT_SUPPORTED: NVMLErrorNotSupported,
-            Return.ERROR_NO_PERMISSION: NVMLErrorInsufficientPermissions,
-            Return.ERROR_ALREADY_INITIALIZED: NVMLErrorAlreadyInitialized,
-            Return.ERROR_NOT_FOUND: NVMLErrorNotFound,
-            Return.ERROR_INSUFFICIENT_SIZE: NVMLErrorInsufficientSize,
-            Return.ERROR_INSUFFICIENT_POWER: NVMLErrorInsufficientExternalPower,
-            Return.ERROR_DRIVER_NOT_LOADED: NVMLErrorDriverNotLoaded,
-            Return.ERROR_TIMEOUT: NVMLErrorTimeout,
-            Return.ERROR_IRQ_ISSUE: NVMLErrorInterruptRequestIssue,
-            Return.ERROR_LIBRARY_NOT_FOUND: NVMLErrorSharedLibraryNotFound,
-            Return.ERROR_FUNCTION_NOT_FOUND: NVMLErrorFunctionNotFound,
-            Return.ERROR_CORRUPTED_INFOROM: NVMLErrorCorruptedInfoROM,
-            Return.ERROR_GPU_IS_LOST: NVMLErrorGPUIsLost,
-            Return.ERROR_RESET_REQUIRED: NVMLErrorGPUResetRequired,
-            Return.ERROR_OPERATING_SYSTEM: NVMLErrorOperatingSystem,
-            Return.ERROR_LIB_RM_VERSION_MISMATCH: NVMLErrorVersionMismatch,
-            Return.ERROR_UNKNOWN: NVMLErrorUnknown,
-        }
-        return error2exception[self]
+        return _EXCEPTIONS[self.value]
 
     @staticmethod
     def check(ret: int, *args):
-        if ret == Return.SUCCESS.value:
-            return Return(ret)
-        else:
-            raise NVMLError.from_return(ret)(*args)
+        # plain int comparison, the enum is only needed on failure
+        if ret == _SUCCESS:
+            return _RETURN_SUCCESS
+        exception = _EXCEPTIONS.get(ret)
+        if exception is None:
+            # a code this version of the bindings does not know
+            raise NVMLError(ret)
+        raise exception(*args)
+
+
+_SUCCESS = Return.SUCCESS.value
+_RETURN_SUCCESS = Return.SUCCESS
+# members by value, looked up on the error path instead of calling Return(value)
+_RETURN_BY_VALUE = {member.value: member for member in Return}
+# message of each error code, built once instead of on every Return.__str__
+_ERROR_STRINGS = {
+    Return.ERROR_UNINITIALIZED: "Uninitialized",
+    Return.ERROR_INVALID_ARGUMENT: "Invalid Argument",
+    Return.ERROR_NOT_SUPPORTED: "Not Supported",
+    Return.ERROR_NO_PERMISSION: "Insufficient Permissions",
+    Return.ERROR_ALREADY_INITIALIZED: "Already Initialized",
+    Return.ERROR_NOT_FOUND: "Not Found",
+    Return.ERROR_INSUFFICIENT_SIZE: "Insufficient Size",
+    Return.ERROR_INSUFFICIENT_POWER: "Insufficient External Power",
+    Return.ERROR_DRIVER_NOT_LOADED: "Driver Not Loaded",
+    Return.ERROR_TIMEOUT: "Timeout",
+    Return.ERROR_IRQ_ISSUE: "Interrupt Request Issue",
+    Return.ERROR_LIBRARY_NOT_FOUND: "NVML Shared Library Not Found",
+    Return.ERROR_FUNCTION_NOT_FOUND: "Function Not Found",
+    Return.ERROR_CORRUPTED_INFOROM: "Corrupted infoROM",
+    Return.ERROR_GPU_IS_LOST: "GPU is lost",
+    Return.ERROR_RESET_REQUIRED: "GPU requires restart",
+    Return.ERROR_OPERATING_SYSTEM: "The operating system has blocked the request.",
+    Return.ERROR_LIB_RM_VERSION_MISMATCH: "RM has detected an NVML/RM version mismatch.",
+    Return.ERROR_UNKNOWN: "Unknown Error",
+}
 
 
 class NVMLError(Exception):
@@ -86,10 +76,11 @@ class NVMLError(Exception):
 
     def __str__(self):
         try:
-            if self.return_value not in Return:
+            ret = _RETURN_BY_VALUE.get(self.return_value)
+            if ret is None:
                 return str(self.get_error_string())
             else:
-                return str(Return(self.return_value))
+                return str(ret)
         except NVMLErrorUninitialized:
             return "NVML Error with code %d" % self.return_value
 
@@ -107,9 +98,9 @@ class NVMLError(Exception):
 
     @staticmethod
     def from_return(return_value: int):
-        if return_value in Return:
-            return Return(return_value).get_exception()
-        else:
+        try:
+            return _EXCEPTIONS[return_value]
+        except KeyError:
             return NVMLError(return_value)
 
 
@@ -211,3 +202,27 @@ class NVMLErrorVersionMismatch(NVMLError):
 class NVMLErrorUnknown(NVMLError):
     def __init__(self):
         super().__init__(Return.ERROR_UNKNOWN.value)
+
+
+# exception class raised for each return code, built once at import
+_EXCEPTIONS = {
+    Return.ERROR_UNINITIALIZED.value: NVMLErrorUninitialized,
+    Return.ERROR_INVALID_ARGUMENT.value: NVMLErrorInvalidArgument,
+    Return.ERROR_NOT_SUPPORTED.value: NVMLErrorNotSupported,
+    Return.ERROR_NO_PERMISSION.value: NVMLErrorInsufficientPermissions,
+    Return.ERROR_ALREADY_INITIALIZED.value: NVMLErrorAlreadyInitialized,
+    Return.ERROR_NOT_FOUND.value: NVMLErrorNotFound,
+    Return.ERROR_INSUFFICIENT_SIZE.value: NVMLErrorInsufficientSize,
+    Return.ERROR_INSUFFICIENT_POWER.value: NVMLErrorInsufficientExternalPower,
+    Return.ERROR_DRIVER_NOT_LOADED.value: NVMLErrorDriverNotLoaded,
+    Return.ERROR_TIMEOUT.value: NVMLErrorTimeout,
+    Return.ERROR_IRQ_ISSUE.value: NVMLErrorInterruptRequestIssue,
+    Return.ERROR_LIBRARY_NOT_FOUND.value: NVMLErrorSharedLibraryNotFound,
+    Return.ERROR_FUNCTION_NOT_FOUND.value: NVMLErrorFunctionNotFound,
+    Return.ERROR_CORRUPTED_INFOROM.value: NVMLErrorCorruptedInfoROM,
+    Return.ERROR_GPU_IS_LOST.value: NVMLErrorGPUIsLost,
+    Return.ERROR_RESET_REQUIRED.value: NVMLErrorGPUResetRequired,
+    Return.ERROR_OPERATING_SYSTEM.value: NVMLErrorOperatingSystem,
+    Return.ERROR_LIB_RM_VERSION_MISMATCH.value: NVMLErrorVersionMismatch,
+    Return.ERROR_UNKNOWN.value: NVMLErrorUnknown,
+}
@@ -1,20 +1,37 @@
-from ctypes import byref, c_uint, pointer
+import math
+import os
+from ctypes import byref, pointer
+from typing import Optional
 
-from pynvml3.errors import Return
+from pynvml3.errors import Return, NVMLErrorTimeout
+from pynvml3.functions import NvmlFunction
 from pynvml3.structs import CEventSetPointer, EventData
 
 
+POLL_MIN_MS = int(os.getenv("PYNVML3_POLL_MIN_MS", "1"))
+"""Default shortest timeout of :func:`EventSet.wait_adaptive`, read from ``PYNVML3_POLL_MIN_MS``."""
+POLL_MAX_MS = int(os.getenv("PYNVML3_POLL_MAX_MS", "100"))
+"""Default longest timeout of :func:`EventSet.wait_adaptive`, read from ``PYNVML3_POLL_MAX_MS``."""
+
+
 class EventSet:
     """Handle to an event set,
     methods that NVML can perform against each device to register
     and wait for some event to occur."""
 
+    # NVML functions, resolved once per event set on first use
+    _fn_create = NvmlFunction("nvmlEventSetCreate")
+    _fn_free = NvmlFunction("nvmlEventSetFree")
+    _fn_wait = NvmlFunction("nvmlEventSetWait_v2")
+
     def __init__(self, lib):
         """Create a new EventSet.
         Args:
             lib (NVMLLib): a reference to the NVMLLib object
         """
         self.lib = lib
+        self.handle = None
+        self._backoff_ms = 0
         self.handle = self._create()
 
     def __del__(self):
@@ -29,10 +46,11 @@ class EventSet:
             - Added in 2.285
 
         """
-        fn = self.lib.get_function_pointer("nvmlEventSetCreate")
+        fn = self._fn_create
         eventSet = CEventSetPointer()
         ret = fn(byref(eventSet))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return eventSet
 
     def free(self) -> None:
@@ -43,19 +61,22 @@ class EventSet:
             - Added in 2.285
 
         """
-        fn = self.lib.get_function_pointer("nvmlEventSetFree")
+        fn = self._fn_free
         ret = fn(self.handle)
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         self.handle = None
 
     # Added in 2.285
     # raises ERROR_TIMEOUT exception on timeout
-    def wait(self, timeout_ms: int) -> EventData:
+    def wait(self, timeout_ms: int, out: EventData = None) -> EventData:
         """Waits on events and delivers events
 
         Args:
             timeout_ms: Maximum amount of wait time in
                 milliseconds for registered event.
+            out: optional EventData to fill, lets polling loops reuse
+                one structure instead of allocating one per call.
 
         Note:
             - If some events are ready to be delivered at the time of the call,
@@ -78,17 +99,51 @@ class EventSet:
         Notes:
             For Fermi or newer fully supported devices.
 
-        Returns: event data
+            With MIG enabled, the event data also identifies the GPU and compute instance.
+            Drivers without ``nvmlEventSetWait_v2`` fall back to ``nvmlEventSetWait``,
+            which leaves these ids untouched.
+
+        Returns: event data, out if it was given
 
         Raises:
              NVMLErrorTimeout: on timeout
 
-        Important:
-            TODO: Implement using ``nvmlEventSetWait_v2``
+        """
+        fn = self._fn_wait
+        data = out if out is not None else EventData()
+        # the prototype declares a pointer, ctypes passes the structure by reference
+        ret = fn(self.handle, data, timeout_ms)
+        if ret:
+            Return.check(ret)
+        return data
+
+    def wait_adaptive(self, min_ms: int = POLL_MIN_MS, max_ms: int = POLL_MAX_MS,
+                      factor: float = 2, out: EventData = None) -> Optional[EventData]:
+        """Waits on events like :func:`wait`, but with a timeout that adapts to the event rate.
+
+        Every call that times out multiplies the timeout of the next call by factor,
+        up to max_ms. A delivered event resets the timeout to min_ms.
+        Loops that poll for rare events thereby wake up less often,
+        without delaying frequent events.
+
+        Args:
+            min_ms: shortest timeout in milliseconds
+            max_ms: longest timeout in milliseconds
+            factor: growth of the timeout after every timeout, greater than 1
+            out: optional EventData to fill, see :func:`wait`
+
+        Returns: event data, None if no event arrived before the timeout
 
         """
-        fn = self.lib.get_function_pointer("nvmlEventSetWait")
-        data = EventData()
-        ret = fn(self.handle, byref(data), c_uint(timeout_ms))
-        Return.check(ret)
+        if not 0 < min_ms <= max_ms:
+            raise ValueError(f"Expected 0 < min_ms <= max_ms. But was min_ms={min_ms}, max_ms={max_ms}")
+        if factor <= 1:
+            raise ValueError(f"factor must be greater than 1. But was {factor}")
+        timeout_ms = min(max(self._backoff_ms, min_ms), max_ms)
+        try:
+            data = self.wait(timeout_ms, out)
+        except NVMLErrorTimeout:
+            self._backoff_ms = min(math.ceil(timeout_ms * factor), max_ms)
+            return None
+        self._backoff_ms = min_ms
         return data
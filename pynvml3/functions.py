@@ -0,0 +1,330 @@
+"""Names of all NVML functions used by these bindings.
+
+The library resolves these symbols once, right after it has been loaded,
+so that later calls never have to look them up again.
+"""
+from ctypes import c_char_p, c_int, c_uint, c_ulong, c_ulonglong, POINTER
+
+from pynvml3.structs import CDevicePointer, Memory, Utilization, EccErrorCounts, ProcessInfo, PciInfo, \
+    NvLinkUtilizationControl, CUnitPointer, UnitInfo, LedState, PSUInfo, UnitFanSpeeds, AccountingStats, \
+    ViolationTime, CEventSetPointer, EventData, RawSample, FieldValue
+
+NVML_FUNCTIONS = frozenset([
+    # Initialization and cleanup
+    "nvmlErrorString",
+    "nvmlInit_v2",
+    "nvmlShutdown",
+    # System queries
+    "nvmlSystemGetCudaDriverVersion_v2",
+    "nvmlSystemGetDriverVersion",
+    "nvmlSystemGetHicVersion",
+    "nvmlSystemGetNVMLVersion",
+    "nvmlSystemGetProcessName",
+    "nvmlSystemGetTopologyGpuSet",
+    # Unit queries and commands
+    "nvmlUnitGetCount",
+    "nvmlUnitGetDevices",
+    "nvmlUnitGetFanSpeedInfo",
+    "nvmlUnitGetHandleByIndex",
+    "nvmlUnitGetLedState",
+    "nvmlUnitGetPsuInfo",
+    "nvmlUnitGetTemperature",
+    "nvmlUnitGetUnitInfo",
+    "nvmlUnitSetLedState",
+    # Event handling
+    "nvmlDeviceGetSupportedEventTypes",
+    "nvmlDeviceRegisterEvents",
+    "nvmlEventSetCreate",
+    "nvmlEventSetFree",
+    "nvmlEventSetWait_v2",
+    # NvLink methods
+    "nvmlDeviceFreezeNvLinkUtilizationCounter",
+    "nvmlDeviceGetNvLinkCapability",
+    "nvmlDeviceGetNvLinkErrorCounter",
+    "nvmlDeviceGetNvLinkRemotePciInfo",
+    "nvmlDeviceGetNvLinkState",
+    "nvmlDeviceGetNvLinkUtilizationControl",
+    "nvmlDeviceGetNvLinkUtilizationCounter",
+    "nvmlDeviceGetNvLinkVersion",
+    "nvmlDeviceResetNvLinkErrorCounters",
+    "nvmlDeviceResetNvLinkUtilizationCounter",
+    "nvmlDeviceSetNvLinkUtilizationControl",
+    # Drain state
+    "nvmlDeviceDiscoverGpus",
+    "nvmlDeviceModifyDrainState",
+    "nvmlDeviceQueryDrainState",
+    "nvmlDeviceRemoveGpu",
+    # Device queries and commands
+    "nvmlDeviceClearAccountingPids",
+    "nvmlDeviceClearCpuAffinity",
+    "nvmlDeviceClearEccErrorCounts",
+    "nvmlDeviceGetAPIRestriction",
+    "nvmlDeviceGetAccountingBufferSize",
+    "nvmlDeviceGetAccountingMode",
+    "nvmlDeviceGetAccountingPids",
+    "nvmlDeviceGetAccountingStats",
+    "nvmlDeviceGetApplicationsClock",
+    "nvmlDeviceGetAutoBoostedClocksEnabled",
+    "nvmlDeviceGetBAR1MemoryInfo",
+    "nvmlDeviceGetBoardId",
+    "nvmlDeviceGetBrand",
+    "nvmlDeviceGetBridgeChipInfo",
+    "nvmlDeviceGetClock",
+    "nvmlDeviceGetClockInfo",
+    "nvmlDeviceGetComputeMode",
+    "nvmlDeviceGetComputeRunningProcesses",
+    "nvmlDeviceGetCount",
+    "nvmlDeviceGetCount_v2",
+    "nvmlDeviceGetCpuAffinity",
+    "nvmlDeviceGetCudaComputeCapability",
+    "nvmlDeviceGetCurrPcieLinkGeneration",
+    "nvmlDeviceGetCurrPcieLinkWidth",
+    "nvmlDeviceGetCurrentClocksThrottleReasons",
+    "nvmlDeviceGetDecoderUtilization",
+    "nvmlDeviceGetDefaultApplicationsClock",
+    "nvmlDeviceGetDetailedEccErrors",
+    "nvmlDeviceGetDisplayActive",
+    "nvmlDeviceGetDisplayMode",
+    "nvmlDeviceGetDriverModel",
+    "nvmlDeviceGetEccMode",
+    "nvmlDeviceGetEncoderUtilization",
+    "nvmlDeviceGetEnforcedPowerLimit",
+    "nvmlDeviceGetFanSpeed_v2",
+    "nvmlDeviceGetFieldValues",
+    "nvmlDeviceGetGpuOperationMode",
+    "nvmlDeviceGetGraphicsRunningProcesses",
+    "nvmlDeviceGetHandleByIndex_v2",
+    "nvmlDeviceGetHandleByPciBusId_v2",
+    "nvmlDeviceGetHandleBySerial",
+    "nvmlDeviceGetHandleByUUID",
+    "nvmlDeviceGetIndex",
+    "nvmlDeviceGetInforomConfigurationChecksum",
+    "nvmlDeviceGetInforomImageVersion",
+    "nvmlDeviceGetInforomVersion",
+    "nvmlDeviceGetMaxClockInfo",
+    "nvmlDeviceGetMaxCustomerBoostClock",
+    "nvmlDeviceGetMaxPcieLinkGeneration",
+    "nvmlDeviceGetMaxPcieLinkWidth",
+    "nvmlDeviceGetMemoryErrorCounter",
+    "nvmlDeviceGetMemoryInfo",
+    "nvmlDeviceGetMinorNumber",
+    "nvmlDeviceGetMultiGpuBoard",
+    "nvmlDeviceGetName",
+    "nvmlDeviceGetPciInfo_v2",
+    "nvmlDeviceGetPcieReplayCounter",
+    "nvmlDeviceGetPcieThroughput",
+    "nvmlDeviceGetPerformanceState",
+    "nvmlDeviceGetPersistenceMode",
+    "nvmlDeviceGetPowerManagementDefaultLimit",
+    "nvmlDeviceGetPowerManagementLimit",
+    "nvmlDeviceGetPowerManagementLimitConstraints",
+    "nvmlDeviceGetPowerManagementMode",
+    "nvmlDeviceGetPowerState",
+    "nvmlDeviceGetPowerUsage",
+    "nvmlDeviceGetRetiredPages",
+    "nvmlDeviceGetRetiredPagesPendingStatus",
+    "nvmlDeviceGetSamples",
+    "nvmlDeviceGetSerial",
+    "nvmlDeviceGetSupportedClocksThrottleReasons",
+    "nvmlDeviceGetSupportedGraphicsClocks",
+    "nvmlDeviceGetSupportedMemoryClocks",
+    "nvmlDeviceGetTemperature",
+    "nvmlDeviceGetTemperatureThreshold",
+    "nvmlDeviceGetTopologyCommonAncestor",
+    "nvmlDeviceGetTopologyNearestGpus",
+    "nvmlDeviceGetTotalEccErrors",
+    "nvmlDeviceGetTotalEnergyConsumption",
+    "nvmlDeviceGetUUID",
+    "nvmlDeviceGetUtilizationRates",
+    "nvmlDeviceGetVbiosVersion",
+    "nvmlDeviceGetViolationStatus",
+    "nvmlDeviceOnSameBoard",
+    "nvmlDeviceResetApplicationsClocks",
+    "nvmlDeviceResetGpuLockedClocks",
+    "nvmlDeviceSetAPIRestriction",
+    "nvmlDeviceSetAccountingMode",
+    "nvmlDeviceSetApplicationsClocks",
+    "nvmlDeviceSetAutoBoostedClocksEnabled",
+    "nvmlDeviceSetComputeMode",
+    "nvmlDeviceSetCpuAffinity",
+    "nvmlDeviceSetDefaultAutoBoostedClocksEnabled",
+    "nvmlDeviceSetDriverModel",
+    "nvmlDeviceSetEccMode",
+    "nvmlDeviceSetGpuLockedClocks",
+    "nvmlDeviceSetGpuOperationMode",
+    "nvmlDeviceSetPersistenceMode",
+    "nvmlDeviceSetPowerManagementLimit",
+    "nvmlDeviceValidateInforom",
+])
+
+# Older symbols with the same signature, used when a driver
+# does not export the versioned function yet.
+NVML_FALLBACKS = {
+    "nvmlInit_v2": "nvmlInit",
+    "nvmlSystemGetCudaDriverVersion_v2": "nvmlSystemGetCudaDriverVersion",
+    "nvmlDeviceGetCount_v2": "nvmlDeviceGetCount",
+    "nvmlDeviceGetHandleByIndex_v2": "nvmlDeviceGetHandleByIndex",
+    "nvmlDeviceGetHandleByPciBusId_v2": "nvmlDeviceGetHandleByPciBusId",
+    # the v1 function fills only the leading fields of PciInfo
+    "nvmlDeviceGetPciInfo_v2": "nvmlDeviceGetPciInfo",
+    # the v1 function leaves the MIG instance ids of EventData untouched
+    "nvmlEventSetWait_v2": "nvmlEventSetWait",
+}
+
+_HANDLE_UINT_OUT = (CDevicePointer, POINTER(c_uint))
+_HANDLE_IN_UINT_OUT = (CDevicePointer, c_uint, POINTER(c_uint))
+_HANDLE_STRING_OUT = (CDevicePointer, c_char_p, c_uint)
+
+# Prototypes of the frequently polled NVML functions.
+# Setting argtypes once lets ctypes convert arguments with fixed converters
+# instead of inspecting every argument on every call,
+# and allows passing plain ints where NVML expects an unsigned int.
+NVML_PROTOTYPES = {
+    "nvmlDeviceGetCount_v2": (POINTER(c_uint),),
+    # System
+    "nvmlSystemGetNVMLVersion": (c_char_p, c_uint),
+    "nvmlSystemGetDriverVersion": (c_char_p, c_uint),
+    "nvmlSystemGetProcessName": (c_uint, c_char_p, c_uint),
+    "nvmlSystemGetTopologyGpuSet": (c_uint, POINTER(c_uint), POINTER(CDevicePointer)),
+    # Identification
+    "nvmlDeviceGetName": _HANDLE_STRING_OUT,
+    "nvmlDeviceGetSerial": _HANDLE_STRING_OUT,
+    "nvmlDeviceGetUUID": _HANDLE_STRING_OUT,
+    "nvmlDeviceGetVbiosVersion": _HANDLE_STRING_OUT,
+    "nvmlDeviceGetInforomImageVersion": _HANDLE_STRING_OUT,
+    "nvmlDeviceGetInforomVersion": (CDevicePointer, c_uint, c_char_p, c_uint),
+    "nvmlDeviceGetCpuAffinity": (CDevicePointer, c_uint, POINTER(c_ulong)),
+    # Clocks
+    "nvmlDeviceGetClock": (CDevicePointer, c_uint, c_uint, POINTER(c_uint)),
+    "nvmlDeviceGetClockInfo": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetMaxClockInfo": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetApplicationsClock": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetDefaultApplicationsClock": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetMaxCustomerBoostClock": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetCurrentClocksThrottleReasons": (CDevicePointer, POINTER(c_ulonglong)),
+    "nvmlDeviceGetSupportedMemoryClocks": (CDevicePointer, POINTER(c_uint), POINTER(c_uint)),
+    "nvmlDeviceGetSupportedGraphicsClocks": (CDevicePointer, c_uint, POINTER(c_uint), POINTER(c_uint)),
+    "nvmlDeviceSetApplicationsClocks": (CDevicePointer, c_uint, c_uint),
+    "nvmlDeviceSetGpuLockedClocks": (CDevicePointer, c_uint, c_uint),
+    "nvmlDeviceSetDefaultAutoBoostedClocksEnabled": (CDevicePointer, c_uint, c_uint),
+    "nvmlDeviceSetAutoBoostedClocksEnabled": (CDevicePointer, c_uint),
+    # Thermals and power
+    "nvmlDeviceGetFanSpeed_v2": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetTemperature": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetTemperatureThreshold": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetPowerState": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetPerformanceState": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetPowerUsage": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetPowerManagementLimit": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetEnforcedPowerLimit": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetPowerManagementMode": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetTotalEnergyConsumption": (CDevicePointer, POINTER(c_ulonglong)),
+    "nvmlDeviceSetPowerManagementLimit": (CDevicePointer, c_uint),
+    "nvmlDeviceGetViolationStatus": (CDevicePointer, c_uint, POINTER(ViolationTime)),
+    "nvmlDeviceGetSamples": (CDevicePointer, c_uint, c_ulonglong, POINTER(c_uint), POINTER(c_uint),
+                             POINTER(RawSample)),
+    "nvmlDeviceGetFieldValues": (CDevicePointer, c_int, POINTER(FieldValue)),
+    # Memory and utilization
+    "nvmlDeviceGetMemoryInfo": (CDevicePointer, POINTER(Memory)),
+    "nvmlDeviceGetUtilizationRates": (CDevicePointer, POINTER(Utilization)),
+    "nvmlDeviceGetEncoderUtilization": (CDevicePointer, POINTER(c_uint), POINTER(c_uint)),
+    "nvmlDeviceGetDecoderUtilization": (CDevicePointer, POINTER(c_uint), POINTER(c_uint)),
+    "nvmlDeviceGetComputeMode": _HANDLE_UINT_OUT,
+    # Modes and states
+    "nvmlDeviceSetAPIRestriction": (CDevicePointer, c_uint, c_uint),
+    "nvmlDeviceSetComputeMode": (CDevicePointer, c_uint),
+    "nvmlDeviceSetEccMode": (CDevicePointer, c_uint),
+    "nvmlDeviceSetGpuOperationMode": (CDevicePointer, c_uint),
+    "nvmlDeviceSetPersistenceMode": (CDevicePointer, c_uint),
+    "nvmlDeviceSetAccountingMode": (CDevicePointer, c_uint),
+    "nvmlDeviceGetAccountingMode": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetAccountingStats": (CDevicePointer, c_uint, POINTER(AccountingStats)),
+    "nvmlDeviceGetRetiredPagesPendingStatus": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetAPIRestriction": _HANDLE_IN_UINT_OUT,
+    # ECC
+    "nvmlDeviceClearEccErrorCounts": (CDevicePointer, c_uint),
+    "nvmlDeviceGetTotalEccErrors": (CDevicePointer, c_uint, c_uint, POINTER(c_ulonglong)),
+    "nvmlDeviceGetDetailedEccErrors": (CDevicePointer, c_uint, c_uint, POINTER(EccErrorCounts)),
+    "nvmlDeviceGetMemoryErrorCounter": (CDevicePointer, c_uint, c_uint, c_uint, POINTER(c_ulonglong)),
+    "nvmlDeviceGetRetiredPages": (CDevicePointer, c_uint, POINTER(c_uint), POINTER(c_ulonglong)),
+    # Processes
+    "nvmlDeviceGetComputeRunningProcesses": (CDevicePointer, POINTER(c_uint), POINTER(ProcessInfo)),
+    "nvmlDeviceGetGraphicsRunningProcesses": (CDevicePointer, POINTER(c_uint), POINTER(ProcessInfo)),
+    # PCIe
+    "nvmlDeviceGetPcieThroughput": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetPcieReplayCounter": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetCurrPcieLinkGeneration": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetCurrPcieLinkWidth": _HANDLE_UINT_OUT,
+    "nvmlDeviceGetIndex": _HANDLE_UINT_OUT,
+    # NvLink
+    "nvmlDeviceFreezeNvLinkUtilizationCounter": (CDevicePointer, c_uint, c_uint, c_uint),
+    "nvmlDeviceGetNvLinkCapability": (CDevicePointer, c_uint, c_uint, POINTER(c_uint)),
+    "nvmlDeviceGetNvLinkErrorCounter": (CDevicePointer, c_uint, c_uint, POINTER(c_ulonglong)),
+    "nvmlDeviceGetNvLinkRemotePciInfo": (CDevicePointer, c_uint, POINTER(PciInfo)),
+    "nvmlDeviceGetNvLinkState": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceGetNvLinkUtilizationControl": (CDevicePointer, c_uint, c_uint, POINTER(NvLinkUtilizationControl)),
+    "nvmlDeviceGetNvLinkUtilizationCounter": (CDevicePointer, c_uint, c_uint,
+                                              POINTER(c_ulonglong), POINTER(c_ulonglong)),
+    "nvmlDeviceGetNvLinkVersion": _HANDLE_IN_UINT_OUT,
+    "nvmlDeviceResetNvLinkErrorCounters": (CDevicePointer, c_uint),
+    "nvmlDeviceResetNvLinkUtilizationCounter": (CDevicePointer, c_uint, c_uint),
+    "nvmlDeviceSetNvLinkUtilizationControl": (CDevicePointer, c_uint, c_uint,
+                                              POINTER(NvLinkUtilizationControl), c_uint),
+    # Topology
+    "nvmlDeviceGetTopologyCommonAncestor": (CDevicePointer, CDevicePointer, POINTER(c_uint)),
+    "nvmlDeviceGetTopologyNearestGpus": (CDevicePointer, c_uint, POINTER(c_uint), POINTER(CDevicePointer)),
+    # Events
+    "nvmlDeviceRegisterEvents": (CDevicePointer, c_ulonglong, CEventSetPointer),
+    "nvmlEventSetCreate": (POINTER(CEventSetPointer),),
+    "nvmlEventSetFree": (CEventSetPointer,),
+    "nvmlEventSetWait_v2": (CEventSetPointer, POINTER(EventData), c_uint),
+    # Units
+    "nvmlUnitGetUnitInfo": (CUnitPointer, POINTER(UnitInfo)),
+    "nvmlUnitGetLedState": (CUnitPointer, POINTER(LedState)),
+    "nvmlUnitGetPsuInfo": (CUnitPointer, POINTER(PSUInfo)),
+    "nvmlUnitGetTemperature": (CUnitPointer, c_uint, POINTER(c_uint)),
+    "nvmlUnitGetFanSpeedInfo": (CUnitPointer, POINTER(UnitFanSpeeds)),
+    "nvmlUnitGetDevices": (CUnitPointer, POINTER(c_uint), POINTER(CDevicePointer)),
+    "nvmlUnitSetLedState": (CUnitPointer, c_uint),
+}
+
+
+def apply_prototype(name: str, fn) -> None:
+    """Sets ``argtypes`` and ``restype`` of ``fn``, if a prototype is known for ``name``.
+    No ``errcheck`` is set, ctypes would call it on every successful call too;
+    callers check the return code inline with ``if ret: Return.check(ret)``."""
+    argtypes = NVML_PROTOTYPES.get(name)
+    if argtypes is not None:
+        fn.argtypes = argtypes
+        fn.restype = c_int
+
+
+class NvmlFunction:
+    """Descriptor that resolves an NVML function pointer on first access
+    and stores it on the instance, so that later accesses are plain
+    attribute lookups.
+
+    The owning object must provide a ``lib`` attribute
+    referencing the :class:`pynvml3.pynvml.NVMLLib`.
+
+    Examples:
+        e.g. a class that calls ``nvmlDeviceGetIndex`` declares::
+
+            _fn_get_index = NvmlFunction("nvmlDeviceGetIndex")
+
+        and calls ``self._fn_get_index(self.handle, byref(c_index))``.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.attribute = None
+
+    def __set_name__(self, owner, attribute):
+        self.attribute = attribute
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        fn = instance.lib.get_function_pointer(self.name)
+        instance.__dict__[self.attribute] = fn
+        return fn
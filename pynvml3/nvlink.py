@@ -1,18 +1,83 @@
-from ctypes import c_uint, byref, c_ulonglong
-from typing import Tuple
+import time
+from ctypes import Array, c_ulonglong
+from typing import Iterable, Tuple, List
 
-from pynvml3.enums import EnableState, NvLinkCapability, NvLinkErrorCounter
+from pynvml3.constants import NVML_NVLINK_MAX_LINKS
+from pynvml3.enums import EnableState, NvLinkCapability, NvLinkErrorCounter, FieldId, ValueType
 from pynvml3.errors import Return
-from pynvml3.structs import PciInfo, NvLinkUtilizationControl
+from pynvml3.functions import NvmlFunction
+from pynvml3.structs import PciInfo, NvLinkUtilizationControl, FieldValue
+
+# field ids of every error counter, one per link
+_ERROR_COUNTER_FIELDS = {
+    counter: tuple(FieldId[f"NVLINK_{counter.name}_ERROR_COUNT_L{link}"] for link in range(NVML_NVLINK_MAX_LINKS))
+    for counter in NvLinkErrorCounter
+}
+
+
+def _field_value(field_value: FieldValue):
+    """Returns the value of a field value sample, raises if NVML could not retrieve it."""
+    if field_value.nvmlReturn:
+        Return.check(field_value.nvmlReturn)
+    return field_value.value.get_value(ValueType(field_value.valueType))
 
 
 class NvLink:
     """Methods that NVML can perform on NVLINK enabled devices."""
 
+    # NVML functions, resolved once per link on first use.
+    # Their prototypes declare structure arguments as pointers,
+    # so structures are passed as is and ctypes passes them by reference.
+    _fn_freeze_utilization_counter = NvmlFunction("nvmlDeviceFreezeNvLinkUtilizationCounter")
+    _fn_get_capability = NvmlFunction("nvmlDeviceGetNvLinkCapability")
+    _fn_get_error_counter = NvmlFunction("nvmlDeviceGetNvLinkErrorCounter")
+    _fn_get_remote_pci_info = NvmlFunction("nvmlDeviceGetNvLinkRemotePciInfo")
+    _fn_get_state = NvmlFunction("nvmlDeviceGetNvLinkState")
+    _fn_get_utilization_control = NvmlFunction("nvmlDeviceGetNvLinkUtilizationControl")
+    _fn_get_utilization_counter = NvmlFunction("nvmlDeviceGetNvLinkUtilizationCounter")
+    _fn_get_version = NvmlFunction("nvmlDeviceGetNvLinkVersion")
+    _fn_reset_error_counters = NvmlFunction("nvmlDeviceResetNvLinkErrorCounters")
+    _fn_reset_utilization_counter = NvmlFunction("nvmlDeviceResetNvLinkUtilizationCounter")
+    _fn_set_utilization_control = NvmlFunction("nvmlDeviceSetNvLinkUtilizationControl")
+
     def __init__(self, device, link_id):
         self.device = device
         self.link = link_id
         self.lib = self.device.lib
+        # shortcuts for the hot path
+        self.handle = device.handle
+        self._scratch = device._scratch
+
+    def begin_utilization_capture(self, counter: int, control: NvLinkUtilizationControl,
+                                  num_links: int = NVML_NVLINK_MAX_LINKS) -> None:
+        """
+        Starts counting with the given control on the links 0 to num_links - 1:
+        sets the control, which also resets the counter, and unfreezes the counter.
+        Equivalent to calling :func:`set_utilization_control` with reset and
+        :func:`freeze_utilization_counter` with FEATURE_DISABLED for every link,
+        but with the function pointers and handle resolved once for all links.
+
+        PASCAL_OR_NEWER
+        @param counter: Specifies the counter that should be set up (0 or 1).
+        @type counter: int
+        @param control: the units and packet filter to count
+        @type control: NvLinkUtilizationControl
+        @param num_links: number of links to set up
+        @type num_links: int
+        @return: None
+        @rtype: None
+        """
+        set_control = self._fn_set_utilization_control
+        freeze = self._fn_freeze_utilization_counter
+        handle = self.handle
+        unfrozen = EnableState.FEATURE_DISABLED.value
+        for link in range(num_links):
+            ret = set_control(handle, link, counter, control, 1)
+            if ret:
+                Return.check(ret)
+            ret = freeze(handle, link, counter, unfrozen)
+            if ret:
+                Return.check(ret)
 
     def freeze_utilization_counter(self, counter: int, freeze: EnableState) -> None:
         """
@@ -29,9 +94,9 @@ class NvLink:
         @return: None
         @rtype: None
         """
-        fn = self.lib.get_function_pointer("nvmlDeviceFreezeNvLinkUtilizationCounter")
-        ret = fn(self.device.handle, c_uint(self.link), c_uint(counter), freeze.as_c_type())
-        Return.check(ret)
+        ret = self._fn_freeze_utilization_counter(self.handle, self.link, counter, freeze.value)
+        if ret:
+            Return.check(ret)
 
     def get_capability(self, link: int, capability: NvLinkCapability) -> bool:
         """
@@ -47,11 +112,22 @@ class NvLink:
         @return: A boolean for the queried capability indicating that feature is available
         @rtype: bool
         """
-        cap_result = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetNvLinkCapability")
-        ret = fn(self.device.handle, c_uint(link), capability.as_c_type(), byref(cap_result))
-        Return.check(ret)
-        return bool(cap_result.value)
+        return bool(self.get_capability_raw(link, capability))
+
+    def get_capability_raw(self, link: int, capability: NvLinkCapability) -> int:
+        """
+        Same as :func:`get_capability`, but returns the raw integer reported by NVML.
+        Useful when sweeping many links, where the conversion is not needed.
+
+        PASCAL_OR_NEWER
+        @return: non-zero if the queried feature is available
+        @rtype: int
+        """
+        scratch = self._scratch
+        ret = self._fn_get_capability(self.handle, link, capability.value, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     def get_error_counter(self, link: int, counter: NvLinkErrorCounter) -> int:
         """ Retrieves the specified error counter value.
@@ -61,11 +137,42 @@ class NvLink:
         @return: error counter value
         @rtype: int
         """
-        counter_value = c_ulonglong()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetNvLinkErrorCounter")
-        ret = fn(self.device.handle, c_uint(link), counter.as_c_type(), byref(counter_value))
-        Return.check(ret)
-        return counter_value.value
+        scratch = self._scratch
+        ret = self._fn_get_error_counter(self.handle, link, counter.value, scratch.ulonglong_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.ulonglong.value
+
+    def get_error_counters(self, counter: NvLinkErrorCounter,
+                           num_links: int = NVML_NVLINK_MAX_LINKS) -> List[int]:
+        """
+        Retrieves the specified error counter of the links 0 to num_links - 1.
+        Equivalent to calling :func:`get_error_counter` for every link,
+        but all counters are read with a single nvmlDeviceGetFieldValues call.
+
+        PASCAL_OR_NEWER
+        @param counter: the error counter to query
+        @type counter: NvLinkErrorCounter
+        @param num_links: number of links to query, at most NVML_NVLINK_MAX_LINKS
+        @type num_links: int
+        @return: the counter value of every link
+        @rtype: List[int]
+        """
+        if num_links > NVML_NVLINK_MAX_LINKS:
+            raise ValueError(f"num_links must not exceed {NVML_NVLINK_MAX_LINKS}. But was {num_links}")
+        field_values = self.get_field_values(_ERROR_COUNTER_FIELDS[counter][:num_links])
+        return [_field_value(field_value) for field_value in field_values]
+
+    def get_field_values(self, field_ids: Iterable[FieldId]) -> List[FieldValue]:
+        """
+        Requests several NvLink fields of the device with a single NVML call,
+        see :func:`Device.get_multiple_field_values`.
+        @param field_ids: the fields to query, e.g. FieldId.NVLINK_BANDWIDTH_C0_TOTAL
+        @type field_ids: Iterable[FieldId]
+        @return: one FieldValue per requested field, in the same order
+        @rtype: List[FieldValue]
+        """
+        return self.device.get_multiple_field_values(field_ids)
 
     def get_remote_pci_info(self, link: int) -> PciInfo:
         """Retrieves the PCI information for the remote node on a NvLink link
@@ -73,20 +180,27 @@ class NvLink:
 
         PASCAL_OR_NEWER"""
         pci_info = PciInfo()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetNvLinkRemotePciInfo")
-        ret = fn(self.device.handle, c_uint(link), byref(pci_info))
-        Return.check(ret)
+        ret = self._fn_get_remote_pci_info(self.handle, link, pci_info)
+        if ret:
+            Return.check(ret)
         return pci_info
 
     def get_state(self, link: int) -> EnableState:
         """Retrieves the state of the device's NvLink for the link specified
 
         PASCAL_OR_NEWER"""
-        is_active = EnableState.c_type()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetNvLinkState")
-        ret = fn(self.device.handle, c_uint(link), byref(is_active))
-        Return.check(ret)
-        return EnableState(is_active.value)
+        return EnableState(self.get_state_raw(link))
+
+    def get_state_raw(self, link: int) -> int:
+        """Same as :func:`get_state`, but returns the raw integer value
+        of the ``EnableState`` instead of constructing the enum member.
+
+        PASCAL_OR_NEWER"""
+        scratch = self._scratch
+        ret = self._fn_get_state(self.handle, link, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
 
     def get_utilization_control(self, link: int, counter: int) -> NvLinkUtilizationControl:
         """Get the NVLINK utilization counter control information for the specified counter, 0 or 1.
@@ -102,37 +216,198 @@ class NvLink:
         """
 
         control = NvLinkUtilizationControl()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetNvLinkUtilizationControl")
-        ret = fn(self.device.handle, c_uint(link), c_uint(counter), byref(control))
-        Return.check(ret)
+        ret = self._fn_get_utilization_control(self.handle, link, counter, control)
+        if ret:
+            Return.check(ret)
         return control
 
     def get_utilization_counter(self, link: int, counter: int) -> Tuple[int ,int]:
-        rx_counter, tx_counter = c_ulonglong(), c_ulonglong()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetNvLinkUtilizationCounter")
-        ret = fn(self.device.handle, c_uint(link), c_uint(counter), byref(rx_counter), byref(tx_counter))
-        Return.check(ret)
-        return rx_counter.value, tx_counter.value
+        scratch = self._scratch
+        ret = self._fn_get_utilization_counter(self.handle, link, counter,
+                                               scratch.ulonglong_ref, scratch.ulonglong2_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.ulonglong.value, scratch.ulonglong2.value
+
+    def get_utilization_counters(self, counter: int,
+                                 num_links: int = NVML_NVLINK_MAX_LINKS) -> List[Tuple[int, int]]:
+        """
+        Retrieves the receive and transmit utilization counter of the links 0 to num_links - 1.
+        Equivalent to calling :func:`get_utilization_counter` for every link, but with the
+        function pointer, handle and output buffers set up once for all links.
+
+        PASCAL_OR_NEWER
+        @param counter: Specifies the counter that should be queried (0 or 1).
+        @type counter: int
+        @param num_links: number of links to query
+        @type num_links: int
+        @return: (rx, tx) counter of every link
+        @rtype: List[Tuple[int, int]]
+        """
+        scratch = self._scratch
+        rx_counter, tx_counter = scratch.ulonglong, scratch.ulonglong2
+        rx_ref, tx_ref = scratch.ulonglong_ref, scratch.ulonglong2_ref
+        fn = self._fn_get_utilization_counter
+        handle = self.handle
+        counters = [None] * num_links
+        for link in range(num_links):
+            ret = fn(handle, link, counter, rx_ref, tx_ref)
+            if ret:
+                Return.check(ret)
+            counters[link] = (rx_counter.value, tx_counter.value)
+        return counters
+
+    def get_utilization_counters_array(self, counter: int, num_links: int = NVML_NVLINK_MAX_LINKS,
+                                       rx: Array = None, tx: Array = None) -> Tuple[Array, Array]:
+        """
+        Same as :func:`get_utilization_counters`, but stores the receive and transmit counters
+        in two contiguous arrays of c_ulonglong instead of a list of tuples.
+        The arrays support the buffer protocol, so they can be wrapped without copying,
+        e.g. by ``numpy.frombuffer(rx, dtype=numpy.uint64)``.
+
+        PASCAL_OR_NEWER
+        @param counter: Specifies the counter that should be queried (0 or 1).
+        @type counter: int
+        @param num_links: number of links to query
+        @type num_links: int
+        @param rx: array for the receive counters, reused between polls if given
+        @type rx: Array
+        @param tx: array for the transmit counters, reused between polls if given
+        @type tx: Array
+        @return: receive and transmit counter of every link
+        @rtype: Tuple[Array, Array]
+        """
+        if rx is None:
+            rx = (c_ulonglong * num_links)()
+        elif len(rx) < num_links:
+            raise ValueError(f"rx holds {len(rx)} counters, but {num_links} links are queried")
+        if tx is None:
+            tx = (c_ulonglong * num_links)()
+        elif len(tx) < num_links:
+            raise ValueError(f"tx holds {len(tx)} counters, but {num_links} links are queried")
+        scratch = self._scratch
+        rx_counter, tx_counter = scratch.ulonglong, scratch.ulonglong2
+        rx_ref, tx_ref = scratch.ulonglong_ref, scratch.ulonglong2_ref
+        fn = self._fn_get_utilization_counter
+        handle = self.handle
+        for link in range(num_links):
+            ret = fn(handle, link, counter, rx_ref, tx_ref)
+            if ret:
+                Return.check(ret)
+            rx[link] = rx_counter.value
+            tx[link] = tx_counter.value
+        return rx, tx
 
     def get_version(self, link: int) -> int:
-        version = c_uint()
-        fn = self.lib.get_function_pointer("nvmlDeviceGetNvLinkVersion")
-        ret = fn(self.device.handle, c_uint(link), byref(version))
-        Return.check(ret)
-        return version.value
+        scratch = self._scratch
+        ret = self._fn_get_version(self.handle, link, scratch.uint_ref)
+        if ret:
+            Return.check(ret)
+        return scratch.uint.value
+
+    def get_versions(self, num_links: int = NVML_NVLINK_MAX_LINKS) -> List[int]:
+        """
+        Retrieves the NvLink version of the links 0 to num_links - 1.
+        Equivalent to calling :func:`get_version` for every link, but with the
+        function pointer, handle and output buffer resolved once for all links.
+
+        PASCAL_OR_NEWER
+        @param num_links: number of links to query
+        @type num_links: int
+        @return: the version of every link
+        @rtype: List[int]
+        """
+        versions = [0] * num_links
+        fn = self._fn_get_version
+        handle = self.handle
+        scratch = self._scratch
+        c_version, c_version_ref = scratch.uint, scratch.uint_ref
+        for link in range(num_links):
+            ret = fn(handle, link, c_version_ref)
+            if ret:
+                Return.check(ret)
+            versions[link] = c_version.value
+        return versions
 
     def reset_error_counters(self, link: int) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceResetNvLinkErrorCounters")
-        ret = fn(self.device.handle, c_uint(link))
-        Return.check(ret)
+        ret = self._fn_reset_error_counters(self.handle, link)
+        if ret:
+            Return.check(ret)
 
     def reset_utilization_counter(self, link: int, counter: int) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceResetNvLinkUtilizationCounter")
-        ret = fn(self.device.handle, c_uint(link), c_uint(counter))
-        Return.check(ret)
+        ret = self._fn_reset_utilization_counter(self.handle, link, counter)
+        if ret:
+            Return.check(ret)
+
+    def reset_utilization_counters(self, counter: int, num_links: int = NVML_NVLINK_MAX_LINKS) -> None:
+        """
+        Resets the utilization counter of the links 0 to num_links - 1.
+        Equivalent to calling :func:`reset_utilization_counter` for every link,
+        but with the function pointer and handle resolved once for all links.
+
+        PASCAL_OR_NEWER
+        @param counter: Specifies the counter that should be reset (0 or 1).
+        @type counter: int
+        @param num_links: number of links to reset
+        @type num_links: int
+        @return: None
+        @rtype: None
+        """
+        fn = self._fn_reset_utilization_counter
+        handle = self.handle
+        for link in range(num_links):
+            ret = fn(handle, link, counter)
+            if ret:
+                Return.check(ret)
 
     def set_utilization_control(self, link: int, counter: int,
-                                        control: NvLinkUtilizationControl, reset: bool) -> None:
-        fn = self.lib.get_function_pointer("nvmlDeviceSetNvLinkUtilizationControl")
-        ret = fn(self.device.handle, c_uint(link), c_uint(counter), byref(control), c_uint(reset))
-        Return.check(ret)
\ No newline at end of file
+                                control: NvLinkUtilizationControl, reset: bool) -> None:
+        ret = self._fn_set_utilization_control(self.handle, link, counter, control, 1 if reset else 0)
+        if ret:
+            Return.check(ret)
+
+
+class NvLinkUtilizationPoller:
+    """Polls the utilization counters of several links and returns how much they grew since the last poll.
+
+    The counters are kept as two arrays, one for receive and one for transmit,
+    and the arrays of two consecutive polls are swapped instead of reallocated.
+    :attr:`rx` and :attr:`tx` hold the counters of the latest poll.
+    """
+
+    # the counters are unsigned 64 bit integers and wrap around
+    _COUNTER_MASK = (1 << 64) - 1
+
+    def __init__(self, nvlink: NvLink, counter: int, num_links: int = NVML_NVLINK_MAX_LINKS):
+        """
+        Args:
+            nvlink (NvLink): the device whose links are polled
+            counter: the counter that is polled (0 or 1)
+            num_links: number of links to poll
+        """
+        self.nvlink = nvlink
+        self.counter = counter
+        self.num_links = num_links
+        self.rx, self.tx = nvlink.get_utilization_counters_array(counter, num_links)
+        self._prev_rx = (c_ulonglong * num_links)()
+        self._prev_tx = (c_ulonglong * num_links)()
+        self._timestamp = time.monotonic()
+        self.elapsed = 0.0
+
+    def poll(self) -> Tuple[List[int], List[int]]:
+        """
+        Queries the counters of all links.
+        :attr:`elapsed` is set to the seconds since the previous poll,
+        dividing the deltas by it gives the rate of every link.
+        @return: receive and transmit delta of every link since the previous poll
+        @rtype: Tuple[List[int], List[int]]
+        """
+        prev_rx, prev_tx = self.rx, self.tx
+        self.rx, self.tx = self.nvlink.get_utilization_counters_array(
+            self.counter, self.num_links, self._prev_rx, self._prev_tx)
+        self._prev_rx, self._prev_tx = prev_rx, prev_tx
+        now = time.monotonic()
+        self.elapsed, self._timestamp = now - self._timestamp, now
+        mask = self._COUNTER_MASK
+        return ([(current - previous) & mask for current, previous in zip(self.rx, prev_rx)],
+                [(current - previous) & mask for current, previous in zip(self.tx, prev_tx)])
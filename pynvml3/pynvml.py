@@ -26,10 +26,12 @@
 # THE POSSIBILITY OF SUCH DAMAGE.                                              #
 ################################################################################
 
+import errno
 import os
 import sys
+import threading
+from contextlib import contextmanager
 from ctypes import *
-from functools import lru_cache
 from pathlib import Path
 from typing import List
 
@@ -37,30 +39,120 @@ from pynvml3.device import Device, CDevicePointer
 from pynvml3.errors import NVMLErrorFunctionNotFound,\
     NVMLErrorSharedLibraryNotFound, Return
 from pynvml3.event_set import EventSet
+from pynvml3.functions import NVML_FUNCTIONS, NVML_FALLBACKS, apply_prototype
 from pynvml3.system import System
 from pynvml3.unit import CUnitPointer, Unit
 
+INIT_LOCK_ENV = "PYNVML3_INIT_LOCK"
+"""Environment variable naming a lock file. If it is set, processes initialize NVML one at a time."""
+
+
+@contextmanager
+def _init_lock(path: str):
+    """Holds an exclusive lock on the given file, shared by all processes using the same path."""
+    with open(path, "a+") as lock_file:
+        if sys.platform[:3] == "win":
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    # LK_LOCK gives up after about 10 seconds, keep waiting like flock does
+                    if e.errno != errno.EDEADLOCK:
+                        raise
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
 
 class NVMLLib:
-    """Methods that handle NVML initialization and cleanup."""
+    """Methods that handle NVML initialization and cleanup.
+
+    Concurrent ``nvmlInit`` calls of many processes can block each other in the driver
+    for several seconds. Set the environment variable ``PYNVML3_INIT_LOCK`` to the path
+    of a lock file to let the processes initialize NVML one after another instead.
+    """
+
+    # The library is loaded and its functions resolved only once per process,
+    # all NVMLLib objects share them.
+    _shared_lock = threading.Lock()
+    _shared_nvml_lib = None
+    _shared_function_pointer_cache = None
+    # number of entered NVMLLib contexts, NVML is initialized while it is positive
+    _init_count = 0
+    # values of the System getters that don't change while NVML is initialized,
+    # shared by all System objects and cleared when NVML is shut down
+    _shared_system_cache = {}
 
     def __init__(self):
-        """Load the library."""
-        self.nvml_lib = None
-        self._load_nvml_library()
+        """Load the library, unless it was already loaded by another NVMLLib object."""
+        # Only the first NVMLLib object takes the lock, every later one just
+        # picks up the shared library. The cache is published before the
+        # library, so a loaded library always comes with its cache.
+        if NVMLLib._shared_nvml_lib is None:
+            with NVMLLib._shared_lock:
+                if NVMLLib._shared_nvml_lib is None:
+                    self.nvml_lib = None
+                    self.function_pointer_cache = {}
+                    self._load_nvml_library()
+                    self._resolve_function_pointers()
+                    NVMLLib._shared_function_pointer_cache = self.function_pointer_cache
+                    NVMLLib._shared_nvml_lib = self.nvml_lib
+        self.nvml_lib = NVMLLib._shared_nvml_lib
+        self.function_pointer_cache = NVMLLib._shared_function_pointer_cache
+        self.system_cache = NVMLLib._shared_system_cache
 
     def __enter__(self):
-        """Initialize the library."""
-        fn = self.get_function_pointer("nvmlInit_v2")
-        ret = fn()
-        Return.check(ret)
+        """Initialize the library.
+        Nested contexts share one initialization, only the outermost one calls ``nvmlInit_v2``."""
+        with NVMLLib._shared_lock:
+            if NVMLLib._init_count > 0:
+                NVMLLib._init_count += 1
+                return self
+        # The file lock is taken first, waiting for other processes
+        # must not block the threads of this process that leave their contexts.
+        lock_path = os.getenv(INIT_LOCK_ENV)
+        if lock_path:
+            with _init_lock(lock_path):
+                self._init()
+        else:
+            self._init()
         return self
 
+    def _init(self) -> None:
+        """Calls ``nvmlInit_v2``, unless another thread initialized NVML in the meantime."""
+        with NVMLLib._shared_lock:
+            if NVMLLib._init_count == 0:
+                fn = self.get_function_pointer("nvmlInit_v2")
+                ret = fn()
+                if ret:
+                    Return.check(ret)
+            NVMLLib._init_count += 1
+
     def __exit__(self, *argc, **kwargs):
-        """Leave the library loaded, but shutdown the interface."""
-        fn = self.get_function_pointer("nvmlShutdown")
-        ret = fn()
-        Return.check(ret)
+        """Leave the library loaded, but shutdown the interface once the outermost context is left."""
+        with NVMLLib._shared_lock:
+            if NVMLLib._init_count > 1:
+                NVMLLib._init_count -= 1
+                return
+            NVMLLib._init_count = 0
+            # e.g. the driver may be updated before NVML is initialized again
+            NVMLLib._shared_system_cache.clear()
+            fn = self.get_function_pointer("nvmlShutdown")
+            ret = fn()
+        if ret:
+            Return.check(ret)
 
     def open(self) -> None:
         """Initialize the library.
@@ -77,7 +169,12 @@ class NVMLLib:
         self.__exit__()
 
     def _load_nvml_library(self) -> None:
-        """Load the library."""
+        """Load the library.
+
+        The library is loaded with ``CDLL`` and not ``PyDLL``, so ctypes releases the GIL
+        during every NVML call. Calls that block, e.g. ``nvmlInit_v2`` while another
+        process holds the driver lock, don't stall the other Python threads.
+        """
         try:
             if sys.platform[:3] == "win":
                 search_paths = self._get_search_paths()
@@ -104,15 +201,40 @@ class NVMLLib:
                  win_dir / r"System32\nvml.dll"]
         return paths
 
-    @lru_cache(maxsize=None)
+    def _resolve_function_pointers(self) -> None:
+        """Resolve all known NVML functions right after loading the library.
+
+        Functions missing from the installed driver are cached as None,
+        :func:`get_function_pointer` raises for them when they are used.
+        """
+        for name in NVML_FUNCTIONS:
+            self.function_pointer_cache[name] = self._lookup_function(name)
+
+    def _lookup_function(self, name: str):
+        """Looks up a symbol in the library, falling back to an older
+        compatible symbol if the driver does not export it.
+        Returns None if neither is found."""
+        fn = getattr(self.nvml_lib, name, None)
+        if fn is None and name in NVML_FALLBACKS:
+            fn = getattr(self.nvml_lib, NVML_FALLBACKS[name], None)
+        if fn is not None:
+            apply_prototype(name, fn)
+        return fn
+
     def get_function_pointer(self, name: str) -> "ctypes.CDLL.__init__.<locals>._FuncPtr":
         """Returns a function pointer for the given function name.
         Caching is used for YOUR convenience.
         """
         try:
-            return getattr(self.nvml_lib, name)
-        except AttributeError:
+            fn = self.function_pointer_cache[name]
+        except KeyError:
+            # not a known NVML function, look it up and cache the result, even if it is missing.
+            # Concurrent lookups of the same symbol are harmless, setdefault is atomic
+            # and makes every thread use the pointer that was cached first.
+            fn = self.function_pointer_cache.setdefault(name, self._lookup_function(name))
+        if fn is None:
             raise NVMLErrorFunctionNotFound
+        return fn
 
     @property
     def unit(self) -> "UnitFactory":
@@ -177,7 +299,8 @@ class UnitFactory:
         unit = CUnitPointer()
         fn = self.lib.get_function_pointer("nvmlUnitGetHandleByIndex")
         ret = fn(c_index, byref(unit))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return Unit(self.lib, unit)
 
     def get_count(self) -> int:
@@ -189,7 +312,8 @@ class UnitFactory:
         c_count = c_uint()
         fn = self.lib.get_function_pointer("nvmlUnitGetCount")
         ret = fn(byref(c_count))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_count.value
 
 
@@ -227,7 +351,8 @@ class DeviceFactory:
             function = "nvmlDeviceGetCount_v2"
         fn = self.lib.get_function_pointer(function)
         ret = fn(byref(c_count))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_count.value
 
     def from_index(self, index: int) -> "Device":
@@ -263,7 +388,8 @@ class DeviceFactory:
         handle = CDevicePointer()
         fn = self.lib.get_function_pointer("nvmlDeviceGetHandleByIndex_v2")
         ret = fn(c_index, byref(handle))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return Device(self.lib, handle)
 
     def from_serial(self, serial: str) -> "Device":
@@ -294,7 +420,8 @@ class DeviceFactory:
         handle = CDevicePointer()
         fn = self.lib.get_function_pointer("nvmlDeviceGetHandleBySerial")
         ret = fn(c_serial, byref(handle))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return Device(self.lib, handle)
 
     def from_uuid(self, uuid: str) -> "Device":
@@ -319,7 +446,8 @@ class DeviceFactory:
         handle = CDevicePointer()
         fn = self.lib.get_function_pointer("nvmlDeviceGetHandleByUUID")
         ret = fn(c_uuid, byref(handle))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return Device(self.lib, handle)
 
     def from_pci_bus_id(self, pci_bus_id: str) -> "Device":
@@ -341,5 +469,6 @@ class DeviceFactory:
         handle = CDevicePointer()
         fn = self.lib.get_function_pointer("nvmlDeviceGetHandleByPciBusId_v2")
         ret = fn(c_busId, byref(handle))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return Device(self.lib, handle)
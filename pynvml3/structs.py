@@ -5,7 +5,7 @@ from ctypes import c_char, c_uint, c_ulonglong, Union, c_double, c_ulong, Struct
 from typing import NamedTuple
 
 from pynvml3.enums import LedColor, FanState, BridgeChipType, EnableState, DetachGpuState, PcieLinkState, \
-    NvLinkUtilizationCountUnits, NvLinkUtilizationCountPktTypes, ValueType, FieldId
+    NvLinkUtilizationCountUnits, NvLinkUtilizationCountPktTypes, ValueType, FieldId, PowerState
 
 # Alternative object
 # Allows the object to be printed
@@ -19,6 +19,29 @@ class Sample(NamedTuple):
     value: typing.Union[int, float]
 
 
+class RunningProcess(NamedTuple):
+    """Information about a process running on a device.
+    Mirrors :class:`ProcessInfo`, but ``usedGpuMemory`` may be None
+    (e.g. on Windows with the WDDM driver)."""
+    pid: int
+    usedGpuMemory: typing.Optional[int]
+
+
+class DeviceSnapshot(NamedTuple):
+    """Telemetry sampled by :meth:`Device.snapshot`.
+    Fields that were not requested are None."""
+    gpu_utilization: typing.Optional[int] = None
+    memory_utilization: typing.Optional[int] = None
+    memory_total: typing.Optional[int] = None
+    memory_used: typing.Optional[int] = None
+    temperature: typing.Optional[int] = None
+    power_usage: typing.Optional[int] = None
+    graphics_clock: typing.Optional[int] = None
+    sm_clock: typing.Optional[int] = None
+    memory_clock: typing.Optional[int] = None
+    performance_state: typing.Optional[PowerState] = None
+
+
 class FriendlyObject(object):
     def __init__(self, dictionary):
         for x in dictionary:
@@ -242,7 +265,8 @@ class PciInfo(PrintableStructure):
         pci_info = self  # .nvml_device_get_pci_info()
         fn = NVMLLib().get_function_pointer("nvmlDeviceRemoveGpu")
         ret = fn(byref(pci_info), gpu_state.as_c_type(), link_state.as_c_type())
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
 
     # @staticmethod
     def discover_gpus(self):
@@ -266,7 +290,8 @@ class PciInfo(PrintableStructure):
         # The PCI tree to be searched. Only the domain, bus, and device fields are used in this call.
         fn = NVMLLib().get_function_pointer("nvmlDeviceDiscoverGpus")
         ret = fn(byref(self))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
 
     # @staticmethod
     def modify_drain_state(self, new_state: EnableState) -> None:
@@ -286,7 +311,8 @@ class PciInfo(PrintableStructure):
         # pci_info = self.nvml_device_get_pci_info()
         fn = NVMLLib().get_function_pointer("nvmlDeviceModifyDrainState")
         ret = fn(byref(self), new_state.as_c_type())
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
 
     def query_drain_state(self) -> EnableState:
         """
@@ -305,7 +331,8 @@ class PciInfo(PrintableStructure):
         pci_info = self  # .nvml_device_get_pci_info()
         fn = NVMLLib().get_function_pointer("nvmlDeviceQueryDrainState")
         ret = fn(byref(pci_info), byref(current_state))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return EnableState(current_state.value)
 
 
@@ -400,13 +427,19 @@ class EventData(PrintableStructure):
         eventType: Information about what specific event occurred.
         eventData: Stores XID error for the device in
             the event of nvmlEventTypeXidCriticalError.
+        gpuInstanceId: If MIG is enabled and the event is attributable
+            to a GPU instance, stores a valid GPU instance ID.
+        computeInstanceId: If MIG is enabled and the event is attributable
+            to a compute instance, stores a valid compute instance ID.
 
     """
 
     _fields_ = [
         ('device', CDevicePointer),
         ('eventType', c_ulonglong),
-        ('eventData', c_ulonglong)
+        ('eventData', c_ulonglong),
+        ('gpuInstanceId', c_uint),
+        ('computeInstanceId', c_uint),
     ]
     _fmt_ = {'eventType': "0x%08X"}
 
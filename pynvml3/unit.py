@@ -1,11 +1,14 @@
-from ctypes import c_uint, byref
+from ctypes import c_uint, byref, cast
 from typing import List
 
-from pynvml3.device import Device
+from pynvml3.device import Device, get_array
 from pynvml3.enums import TemperatureSensors, LedColor, TemperatureType
 from pynvml3.errors import Return
+from pynvml3.functions import NvmlFunction
 from pynvml3.structs import CUnitPointer, UnitInfo, LedState, PSUInfo, UnitFanSpeeds, CDevicePointer
 
+_ERROR_INSUFFICIENT_SIZE = Return.ERROR_INSUFFICIENT_SIZE.value
+
 
 class Unit:
     """Queries that NVML can perform against each unit.
@@ -15,6 +18,15 @@ class Unit:
 
     """
 
+    # NVML functions, resolved once per unit on first use
+    _fn_get_devices = NvmlFunction("nvmlUnitGetDevices")
+    _fn_get_fan_speed_info = NvmlFunction("nvmlUnitGetFanSpeedInfo")
+    _fn_get_led_state = NvmlFunction("nvmlUnitGetLedState")
+    _fn_get_psu_info = NvmlFunction("nvmlUnitGetPsuInfo")
+    _fn_get_temperature = NvmlFunction("nvmlUnitGetTemperature")
+    _fn_get_unit_info = NvmlFunction("nvmlUnitGetUnitInfo")
+    _fn_set_led_state = NvmlFunction("nvmlUnitSetLedState")
+
     def __init__(self, lib: "pynvml3.pynvml.NVMLLib", handle: "pynvml3.structs.CUnitPointer"):
         """Acquire the handle for a particular unit, based on its index.
 
@@ -30,7 +42,11 @@ class Unit:
         """
 
         self.lib = lib
+        if not isinstance(handle, CUnitPointer):
+            # converted once, so ctypes can pass it as is on every call
+            handle = cast(handle, CUnitPointer)
         self.handle = handle
+        self._array_size_hints = {}
 
 
     def get_unit_info(self) -> UnitInfo:
@@ -46,9 +62,10 @@ class Unit:
             - Product serial number.
         """
         c_info = UnitInfo()
-        fn = self.lib.get_function_pointer("nvmlUnitGetUnitInfo")
+        fn = self._fn_get_unit_info
         ret = fn(self.handle, byref(c_info))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_info
 
     def get_led_state(self) -> LedState:
@@ -58,9 +75,10 @@ class Unit:
 
         """
         c_state = LedState()
-        fn = self.lib.get_function_pointer("nvmlUnitGetLedState")
+        fn = self._fn_get_led_state
         ret = fn(self.handle, byref(c_state))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_state
 
     def get_psu_info(self) -> PSUInfo:
@@ -76,9 +94,10 @@ class Unit:
 
         """
         c_info = PSUInfo()
-        fn = self.lib.get_function_pointer("nvmlUnitGetPsuInfo")
+        fn = self._fn_get_psu_info
         ret = fn(self.handle, byref(c_info))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_info
 
     def get_temperature(self, temperature_type: TemperatureType) -> int:
@@ -95,9 +114,10 @@ class Unit:
 
         """
         c_temp = c_uint()
-        fn = self.lib.get_function_pointer("nvmlUnitGetTemperature")
-        ret = fn(self.handle, c_uint(temperature_type.value), byref(c_temp))
-        Return.check(ret)
+        fn = self._fn_get_temperature
+        ret = fn(self.handle, temperature_type.value, byref(c_temp))
+        if ret:
+            Return.check(ret)
         return c_temp.value
 
     def get_fan_speed_info(self) -> UnitFanSpeeds:
@@ -107,9 +127,10 @@ class Unit:
 
         """
         c_speeds = UnitFanSpeeds()
-        fn = self.lib.get_function_pointer("nvmlUnitGetFanSpeedInfo")
+        fn = self._fn_get_fan_speed_info
         ret = fn(self.handle, byref(c_speeds))
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
         return c_speeds
 
     def get_device_count(self) -> int:
@@ -121,11 +142,11 @@ class Unit:
         """
         c_count = c_uint(0)
         # query the unit to determine device count
-        fn = self.lib.get_function_pointer("nvmlUnitGetDevices")
+        fn = self._fn_get_devices
         ret = fn(self.handle, byref(c_count), None)
-        if ret == Return.ERROR_INSUFFICIENT_SIZE.value:
-            ret = Return.SUCCESS.value
-        Return.check(ret)
+        # insufficient size is expected, the count is set nevertheless
+        if ret and ret != _ERROR_INSUFFICIENT_SIZE:
+            Return.check(ret)
         return c_count.value
 
     def get_devices(self) -> List["Device"]:
@@ -135,12 +156,7 @@ class Unit:
         Returns: a list of the attached GPU devices
 
         """
-        c_count = c_uint(self.get_device_count())
-        device_array = CDevicePointer * c_count.value
-        c_devices = device_array()
-        fn = self.lib.get_function_pointer("nvmlUnitGetDevices")
-        ret = fn(self.handle, byref(c_count), c_devices)
-        Return.check(ret)
+        c_devices = get_array(self._fn_get_devices, CDevicePointer, self._array_size_hints, self.handle)
         return [Device(self.lib, dev) for dev in c_devices]
 
     def set_led_state(self, color: LedColor) -> None:
@@ -163,6 +179,7 @@ class Unit:
             For S-class products.
 
         """
-        fn = self.lib.get_function_pointer("nvmlUnitSetLedState")
+        fn = self._fn_set_led_state
         ret = fn(self.handle, color.value)
-        Return.check(ret)
+        if ret:
+            Return.check(ret)
@@ -1,11 +1,22 @@
+import ctypes
+import os
+import tempfile
+import threading
 import time
 from datetime import datetime, timedelta
 from unittest import TestCase
+from unittest.mock import patch
 
-from pynvml3 import FieldId, ValueType, InfoRom, SamplingType
-from pynvml3.pynvml import NVMLLib
+from pynvml3 import FieldId, ValueType, InfoRom, SamplingType, EventSet, NvLink, Unit, MemoryErrorType, \
+    EccCounterType, NVMLErrorNotSupported, NvLinkErrorCounter, PerfPolicyType, NVMLErrorGPUIsLost, \
+    SnapshotCollector, NVMLErrorInsufficientSize, Return, ClockType, GpuTopologyLevel
+from pynvml3.nvlink import NvLinkUtilizationPoller
+from pynvml3.functions import NVML_FUNCTIONS, NvmlFunction
+from pynvml3.pynvml import NVMLLib, INIT_LOCK_ENV, _init_lock
 from pynvml3.system import System
-from pynvml3.device import Device
+from pynvml3.device import Device, poll_devices, poll_energy_consumption, poll_getters, poll_violation_status, \
+    _PROCESS_INFO
+from pynvml3.structs import ProcessInfo
 from psutil import Process
 
 
@@ -47,6 +58,30 @@ class TestDevice(TestCase):
             # for i in NvLinkCapability:
             #     print(str(i), device.get_nv_link_capability(0, i))
 
+    def test_nvlink_error_counters(self):
+        with NVMLLib() as lib:
+            nvlink = NvLink(lib.device.from_index(0), 0)
+            try:
+                counters = nvlink.get_error_counters(NvLinkErrorCounter.REPLAY, 2)
+            except NVMLErrorNotSupported:
+                return
+            self.assertEqual(len(counters), 2)
+
+    def test_nvlink_utilization_poller(self):
+        with NVMLLib() as lib:
+            nvlink = NvLink(lib.device.from_index(0), 0)
+            try:
+                poller = NvLinkUtilizationPoller(nvlink, 0, 2)
+            except NVMLErrorNotSupported:
+                return
+            for _ in range(2):
+                delta_rx, delta_tx = poller.poll()
+                self.assertEqual(len(delta_rx), 2)
+                self.assertEqual(len(delta_tx), 2)
+                self.assertTrue(all(delta >= 0 for delta in delta_rx + delta_tx))
+            with self.assertRaises(ValueError):
+                nvlink.get_utilization_counters_array(0, 2, rx=(ctypes.c_ulonglong * 1)())
+
     def test_nvml_device_get_field_values(self):
         with NVMLLib() as lib:
             device = lib.device.from_index(0)
@@ -57,6 +92,15 @@ class TestDevice(TestCase):
             print("Value", values.value.get_value(ValueType(values.valueType)))
             print("total_energy", device.get_total_energy_consumption())
 
+    def test_nvml_device_get_multiple_field_values(self):
+        with NVMLLib() as lib:
+            device = lib.device.from_index(0)
+            field_ids = [FieldId.TOTAL_ENERGY_CONSUMPTION, FieldId.PCIE_REPLAY_COUNTER]
+            values = device.get_multiple_field_values(field_ids)
+            self.assertEqual(len(field_ids), len(values))
+            for field_id, value in zip(field_ids, values):
+                self.assertEqual(field_id.value, value.fieldId)
+
     def test_system(self):
         with NVMLLib() as lib:
             system = lib.system
@@ -76,8 +120,211 @@ class TestDevice(TestCase):
             # print("unitcount", Unit(0).get_psu_info())
             print("aff", [bin(x) for x in device.get_cpu_affinity()])
 
+    def test_system_versions_cached(self):
+        with NVMLLib() as lib:
+            version = lib.system.get_driver_version()
+            # a missing function raises if it is called, the cached version must be returned instead
+            with patch.dict(lib.function_pointer_cache, {"nvmlSystemGetDriverVersion": None}):
+                self.assertEqual(version, lib.system.get_driver_version())
+
+    def test_supported_clocks(self):
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            for memory_clock in dev.get_supported_memory_clocks():
+                self.assertTrue(dev.get_supported_graphics_clocks(memory_clock))
+
+    def test_immutable_keyword_arguments(self):
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            max_clock = dev.get_max_clock_info(clock_type=ClockType.SM)
+            self.assertEqual(max_clock, dev.get_max_clock_info(ClockType.SM))
+            memory_clock = dev.get_supported_memory_clocks()[0]
+            self.assertEqual(dev.get_supported_graphics_clocks(memory_clock),
+                             dev.get_supported_graphics_clocks(memory_clock_mhz=memory_clock))
+            level = GpuTopologyLevel.SYSTEM
+            self.assertEqual(len(dev.get_topology_nearest_gpus(level=level)),
+                             len(dev.get_topology_nearest_gpus(level)))
+            # keyword and positional calls share one cache entry
+            self.assertEqual(1, sum(key[0] == "get_max_clock_info" for key in dev._immutable_cache))
+
+    def test_detailed_ecc_errors(self):
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            try:
+                counts = dev.get_detailed_ecc_errors(MemoryErrorType.CORRECTED, EccCounterType.VOLATILE_ECC)
+            except NVMLErrorNotSupported:
+                return
+            self.assertGreaterEqual(counts.deviceMemory, 0)
+
     def test_clock_samples(self):
         with NVMLLib() as lib:
             dev = lib.device.from_index(0)
             t = int(time.time() * 1_000_000)
             dev.try_get_samples(SamplingType.PROCESSOR_CLK_SAMPLES, t)
+
+    def test_samples_bounded_retries(self):
+        calls = []
+
+        def get_samples(handle, sampling_type, time_stamp, value_type, count, samples):
+            # a device that always records more samples than the buffer holds
+            calls.append(samples)
+            return Return.SUCCESS.value if samples is None else Return.ERROR_INSUFFICIENT_SIZE.value
+
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            with patch.object(dev, "_fn__get_raw_samples", get_samples):
+                with self.assertRaises(NVMLErrorInsufficientSize):
+                    dev._get_raw_samples(SamplingType.GPU_UTILIZATION_SAMPLES, 0)
+            self.assertEqual(len(calls), 2 * Device.MAX_SAMPLE_ATTEMPTS)
+
+    def test_snapshot(self):
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            print(dev.snapshot())
+            snapshot = dev.snapshot(["temperature", "power_usage"])
+            self.assertIsNotNone(snapshot.temperature)
+            self.assertIsNone(snapshot.memory_used)
+
+    def test_snapshot_collector_error(self):
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            collector = SnapshotCollector(dev, snapshot_hz=1000, fields=["temperature"]).start()
+            self.assertIsNotNone(collector.latest)
+            with patch.object(dev, "snapshot", side_effect=NVMLErrorGPUIsLost):
+                collector._thread.join(1)
+            # the thread stopped, the stale snapshot must not be returned
+            with self.assertRaises(NVMLErrorGPUIsLost):
+                collector.latest
+            with self.assertRaises(NVMLErrorGPUIsLost):
+                collector.stop()
+            # a stopped collector can be started again
+            with collector:
+                self.assertIsNotNone(collector.latest)
+            # above 1000 Hz the events are still waited for at least 1 ms
+            self.assertEqual(1, SnapshotCollector(dev, snapshot_hz=5000)._wait_ms)
+
+    def test_event_set_wait_adaptive(self):
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            event_set = dev.register_events(dev.get_supported_event_types())
+            try:
+                for _ in range(4):
+                    event_set.wait_adaptive(min_ms=1, max_ms=4)
+                    self.assertLessEqual(event_set._backoff_ms, 4)
+                with self.assertRaises(ValueError):
+                    event_set.wait_adaptive(min_ms=5, max_ms=4)
+            finally:
+                event_set.free()
+
+    def test_utilization_rates_ttl(self):
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            self.assertEqual(Device.UTILIZATION_TTL, 0)
+            dev.UTILIZATION_TTL = 10
+            rates = dev.get_utilization_rates()
+            gpu = rates.gpu
+            rates.gpu = gpu + 1
+            # the cached reading is returned without calling NVML,
+            # modifying an earlier result does not change it
+            with patch.object(dev, "_fn_get_utilization_rates", None):
+                self.assertEqual(gpu, dev.get_utilization_rates().gpu)
+
+    def test_paired_getter_ttl(self):
+        with NVMLLib() as lib:
+            dev = lib.device.from_index(0)
+            dev.get_ecc_mode()
+            dev.PAIRED_GETTER_TTL = 0
+            # caching disabled on this device, NVML is queried again
+            with patch.object(dev, "_fn_get_ecc_mode", None):
+                with self.assertRaises(TypeError):
+                    dev.get_ecc_mode()
+
+    def test_poll_devices(self):
+        with NVMLLib() as lib:
+            devices = [lib.device.from_index(i) for i in range(lib.device.get_count())]
+            snapshots = poll_devices(devices, ["temperature"])
+            self.assertEqual(len(snapshots), len(devices))
+            print(snapshots)
+
+    def test_poll_getters(self):
+        with NVMLLib() as lib:
+            devices = [lib.device.from_index(i) for i in range(lib.device.get_count())]
+            results = poll_getters(devices, ["get_name", "get_pcie_replay_counter"])
+            self.assertEqual(len(results), len(devices))
+            for device, result in zip(devices, results):
+                self.assertEqual(device.get_name(), result["get_name"])
+            with self.assertRaises(ValueError):
+                poll_getters(devices, ["get_nothing"])
+            # commands are not getters, they must not run on every device
+            with patch.object(Device, "reset_applications_clocks") as reset:
+                with self.assertRaises(ValueError):
+                    poll_getters(devices, ["reset_applications_clocks"])
+                reset.assert_not_called()
+
+    def test_poll_energy_consumption(self):
+        with NVMLLib() as lib:
+            devices = [lib.device.from_index(i) for i in range(lib.device.get_count())]
+            energy = poll_energy_consumption(devices)
+            self.assertEqual(len(energy), len(devices))
+            # the counters only grow
+            for device, polled in zip(devices, energy):
+                self.assertLessEqual(polled, device.get_total_energy_consumption())
+
+    def test_poll_violation_status(self):
+        with NVMLLib() as lib:
+            devices = [lib.device.from_index(i) for i in range(lib.device.get_count())]
+            policies = [PerfPolicyType.PERF_POLICY_POWER, PerfPolicyType.PERF_POLICY_THERMAL]
+            statuses = poll_violation_status(devices, policies)
+            self.assertEqual(len(statuses), len(devices))
+            for status in statuses:
+                self.assertEqual(len(status), len(policies))
+
+    def test_calls_release_gil(self):
+        with NVMLLib() as lib:
+            for name in ["nvmlInit_v2", "nvmlShutdown", "nvmlDeviceGetPowerUsage"]:
+                fn = lib.get_function_pointer(name)
+                self.assertFalse(fn._flags_ & ctypes._FUNCFLAG_PYTHONAPI, name)
+
+    def test_function_pointers_return_codes(self):
+        with NVMLLib() as lib:
+            handle = lib.device.from_index(0).handle
+            fn = lib.get_function_pointer("nvmlDeviceGetNvLinkState")
+            # the raw function returns the code, only the wrappers raise
+            ret = fn(handle, 1_000, ctypes.byref(ctypes.c_uint()))
+            self.assertNotEqual(Return.SUCCESS.value, ret)
+
+    def test_nested_contexts_share_init(self):
+        with NVMLLib() as lib:
+            with NVMLLib():
+                pass
+            # leaving the inner context must not shut NVML down
+            self.assertGreater(lib.device.get_count(), 0)
+
+    def test_init_lock_wait_releases_shared_lock(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "init.lock")
+            with patch.dict(os.environ, {INIT_LOCK_ENV: path}):
+                lib = NVMLLib()
+                with _init_lock(path):
+                    # another process initializes NVML
+                    thread = threading.Thread(target=lib.__enter__)
+                    thread.start()
+                    thread.join(0.1)
+                    self.assertTrue(thread.is_alive())
+                    # the waiting thread must not block the rest of the process
+                    self.assertTrue(NVMLLib._shared_lock.acquire(timeout=1))
+                    NVMLLib._shared_lock.release()
+                thread.join()
+                lib.__exit__()
+
+    def test_functions_resolved_at_load(self):
+        # every function used through NvmlFunction is resolved right after loading,
+        # so no call ever has to look up a symbol
+        for cls in [Device, NvLink, System, Unit, EventSet]:
+            for attribute in vars(cls).values():
+                if isinstance(attribute, NvmlFunction):
+                    self.assertIn(attribute.name, NVML_FUNCTIONS)
+
+    def test_process_info_layout(self):
+        # running processes are unpacked with a struct format instead of ctypes
+        self.assertEqual(ctypes.sizeof(ProcessInfo), _PROCESS_INFO.size)